@@ -1,6 +1,14 @@
 import os
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); HTTP/1.1 otherwise
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
 # Load .env from project root (one level up from backend/)
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
@@ -8,16 +16,36 @@ load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "uploads")
 KEYFRAMES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "keyframes")
+IMAGE_HOST_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "imghost")
 
 # Ensure directories exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(KEYFRAMES_DIR, exist_ok=True)
 
+# Keyframe image hosting. When IMAGE_HOST_BASE_URL (the public URL of this
+# API, reachable by OpenAI) is set, keyframes are sent to the model as short-
+# lived signed URLs instead of inline base64. IMAGE_HOST_SECRET signs those
+# URLs and must be shared by the API and the Celery workers.
+IMAGE_HOST_BASE_URL = os.getenv("IMAGE_HOST_BASE_URL", "").rstrip("/")
+IMAGE_HOST_SECRET = os.getenv("IMAGE_HOST_SECRET", "")
+IMAGE_HOST_TTL = int(os.getenv("IMAGE_HOST_TTL", "600"))
+
 # Shared OpenAI client with automatic retry on rate-limit (429) errors.
 # max_retries=5 uses exponential backoff; the SDK reads the Retry-After
 # header from the 429 response so it waits exactly the right amount of time.
 # Higher retry count needed for low-tier API keys (3 RPM limit on gpt-4o-mini).
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=5)
+# The connection pool is sized for concurrent fan-out (up to 50 kept-alive
+# connections) so parallel chunk evaluations don't queue on sockets; the read
+# timeout stays long for Whisper uploads of long videos.
+openai_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=5,
+    http_client=DefaultAsyncHttpxClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(600.0, connect=5.0),
+    ),
+)
 
 # ---------------------------------------------------------------------------
 # DGX Spark configuration
@@ -20,6 +20,7 @@ _root.setLevel(logging.INFO)
 from backend.core.config import OPENAI_API_KEY
 from backend.routers.analyze import router as analyze_router
 from backend.routers.polly import router as polly_router
+from backend.routers.images import router as images_router
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +51,7 @@ app.add_middleware(
 # Routers
 app.include_router(analyze_router)
 app.include_router(polly_router)
+app.include_router(images_router)
 
 # Include async routers if available
 if ASYNC_ENABLED:
@@ -60,6 +62,16 @@ else:
     logger.info("⚠️ Running without async features (install Redis + run Celery for full functionality)")
 
 
+@app.on_event("startup")
+async def start_background_probes():
+    """Start the periodic DGX health probe so /health always serves fresh status."""
+    try:
+        from backend.services.dgx import start_dgx_health_probe
+        start_dgx_health_probe()
+    except ImportError:
+        pass
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint with service status."""
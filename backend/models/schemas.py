@@ -3,7 +3,11 @@
 Data flows:  Policy + Video → FrameObservation[] → Verdict[] → Report
 """
 
-from pydantic import BaseModel, Field
+import base64
+import binascii
+from functools import cached_property
+
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Literal
 from datetime import datetime
 
@@ -51,6 +55,28 @@ class PolicyRule(BaseModel):
     )
 
 
+# Leading magic bytes -> MIME type for reference image uploads
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def _sniff_image_mime(image_base64: str) -> str:
+    """MIME type from the first decoded bytes of a base64 image (JPEG fallback)."""
+    try:
+        head = base64.b64decode(image_base64[:16])  # 16 chars -> 12 bytes
+    except (binascii.Error, ValueError):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, mime in _IMAGE_SIGNATURES:
+        if head.startswith(magic):
+            return mime
+    return "image/jpeg"
+
+
 class ReferenceImage(BaseModel):
     id: Optional[str] = Field(
         default=None,
@@ -76,6 +102,21 @@ class ReferenceImage(BaseModel):
         default_factory=list,
         description='Per-reference compliance checks, e.g. ["Is this person present in the frame?", "Are they wearing a hard hat?"]',
     )
+    mime_type: str = Field(
+        default="",
+        description="MIME type of image_base64; sniffed from the image bytes when omitted",
+    )
+
+    @model_validator(mode="after")
+    def _fill_mime_type(self) -> "ReferenceImage":
+        if not self.mime_type:
+            self.mime_type = _sniff_image_mime(self.image_base64)
+        return self
+
+    @cached_property
+    def data_url(self) -> str:
+        """data: URL for OpenAI image_url parts, built once per reference."""
+        return f"data:{self.mime_type};base64,{self.image_base64}"
 
 
 class Policy(BaseModel):
@@ -100,6 +141,10 @@ class Policy(BaseModel):
         default="",
         description="Context from prior monitoring chunks about already-satisfied frequency rules (for live monitoring).",
     )
+    satisfied_rules: list[str] = Field(
+        default_factory=list,
+        description="Descriptions of at_least_once/at_least_n rules already satisfied in prior monitoring chunks. These are not re-sent to the LLM.",
+    )
     accumulated_transcript: str = Field(
         default="",
         description="Full transcript accumulated across all prior monitoring chunks (for speech checklist rules).",
@@ -184,6 +229,10 @@ class ChecklistState(BaseModel):
         default=None,
         description="When compliance expires (if validity_duration set)",
     )
+    expires_at_ts: Optional[float] = Field(
+        default=None,
+        description="expires_at as epoch seconds (for fast expiry comparisons)",
+    )
     
 class ChecklistItem(BaseModel):
     """A single item in the compliance checklist UI."""
@@ -6,7 +6,6 @@ POST /analyze/frame    → Single JPEG frame + Policy → compliance report (rea
 """
 
 import os
-import json
 import time
 import uuid
 import asyncio
@@ -21,9 +20,9 @@ from backend.models.schemas import (
     Policy, PolicyRule, AnalyzeResponse, Report, Verdict,
     KeyframeData, FrameAnalyzeRequest, ParallelBatchRequest,
 )
-from backend.services.video import process_video
+from backend.services.video import process_video, looks_like_video, shrink_image_base64, VIDEO_HEADER_SIZE
 from backend.services.vlm import analyze_frames
-from backend.services.policy import evaluate_and_report, analyze_and_evaluate_combined
+from backend.services.policy import evaluate_and_report, analyze_and_evaluate_combined, COMBINED_MAX_DURATION
 from backend.services.whisper import transcribe_video
 from backend.services.speech_policy import evaluate_speech
 from backend.services.dgx import analyze_frame_dgx, analyze_frames_dgx_parallel
@@ -77,6 +76,31 @@ def _assign_person_thumbnails(report: Report) -> None:
             ps.thumbnail_base64 = best_obs.image_base64
 
 
+def _add_speech_verdicts(report: Report, speech_verdicts: list) -> None:
+    """Merge speech-rule verdicts into a visual report in place."""
+    report.all_verdicts.extend(speech_verdicts)
+    # Only incident-mode speech violations become incidents; checklist-mode are tracked separately
+    report.incidents.extend(v for v in speech_verdicts if not v.compliant and v.mode == "incident")
+    non_compliant_speech = [v for v in speech_verdicts if not v.compliant]
+    if non_compliant_speech:
+        report.overall_compliant = False
+        report.summary += f" Speech: {len(non_compliant_speech)} audio violation(s)."
+    checklist_verdicts = [v for v in report.all_verdicts if v.mode == "checklist"]
+    if checklist_verdicts:
+        report.checklist_fulfilled = all(v.compliant for v in checklist_verdicts)
+
+
+def _check_video_header(video: UploadFile) -> None:
+    """Reject non-video uploads from their first bytes, before saving anything."""
+    head = video.file.read(VIDEO_HEADER_SIZE)
+    video.file.seek(0)
+    if not looks_like_video(head):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected video (MP4/MOV/WebM/MKV/AVI), got {video.content_type}",
+        )
+
+
 def _save_upload(video: UploadFile) -> str:
     """Save uploaded video to disk, return file path.
 
@@ -107,8 +131,7 @@ async def upload_and_detect(
     Used for testing change detection independently.
     """
     video: UploadFile = form_data["video"]
-    if not video.content_type or not video.content_type.startswith("video/"):
-        raise HTTPException(status_code=400, detail=f"Expected video, got {video.content_type}")
+    _check_video_header(video)
 
     file_path = _save_upload(video)
 
@@ -148,6 +171,8 @@ async def analyze_video(
       1. Save video → extract keyframes (change detection)
       2. Send keyframes → GPT-4o vision (VLM observations)
       3. Send observations + policy → GPT-4o-mini (compliance report)
+    Videos shorter than COMBINED_MAX_DURATION merge stages 2 and 3 into a
+    single combined call (plus Whisper and speech evaluation if needed).
 
     Each stage is timed and logged.
     """
@@ -161,7 +186,7 @@ async def analyze_video(
 
     # --- Parse inputs ---
     try:
-        policy = Policy(**json.loads(policy_json))
+        policy = Policy.model_validate_json(policy_json)
         logger.info(f"📋 Policy: {len(policy.rules)} rules, custom_prompt={'yes' if policy.custom_prompt else 'no'}, audio={'on' if policy.include_audio else 'off'}")
         for i, rule in enumerate(policy.rules):
             logger.info(f"   Rule {i+1}: [{rule.type}] {rule.severity} — {rule.description[:80]}")
@@ -169,9 +194,11 @@ async def analyze_video(
         logger.error(f"❌ Invalid policy JSON: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid policy JSON: {e}")
 
-    if not video.content_type or not video.content_type.startswith("video/"):
-        logger.error(f"❌ Bad content type: {video.content_type}")
-        raise HTTPException(status_code=400, detail=f"Expected video, got {video.content_type}")
+    try:
+        _check_video_header(video)
+    except HTTPException:
+        logger.error(f"❌ Not a recognized video container: {video.filename} ({video.content_type})")
+        raise
 
     if not policy.rules and not policy.custom_prompt:
         logger.error("❌ No rules or custom prompt provided")
@@ -214,25 +241,52 @@ async def analyze_video(
     logger.info(f"Rules: {len(visual_rules)} visual, {len(speech_rules)} speech | Duration: {duration:.1f}s")
 
     # --- Short video (webcam chunk): COMBINED single-call pipeline ---
-    if duration < 15.0 and has_visual and not has_speech:
+    # No separate VLM stage: frames, policy and (if any) the transcript go out
+    # in one call; speech rules are evaluated alongside it.
+    if duration < COMBINED_MAX_DURATION and has_visual:
         t0 = time.perf_counter()
 
         # Get effective reference images
-        enabled_refs = getattr(policy, "enabled_reference_ids", []) or []
-        refs = [r for r in policy.reference_images if getattr(r, "id", None) and r.id in enabled_refs] if enabled_refs else []
-
-        try:
-            report = await analyze_and_evaluate_combined(
+        enabled_refs = policy.enabled_reference_ids
+        refs = [r for r in policy.reference_images if r.id and r.id in enabled_refs] if enabled_refs else []
+
+        transcript = None
+        if has_speech or policy.include_audio:
+            try:
+                transcript = await transcribe_video(file_path)
+            except Exception as e:
+                logger.warning(f"Whisper failed (non-fatal): {e}")
+
+        eval_tasks = [
+            analyze_and_evaluate_combined(
                 keyframes=video_result.keyframes,
-                policy=policy,
+                policy=policy.model_copy(update={"rules": visual_rules}) if has_speech else policy,
                 video_id=video_result.video_id,
                 video_duration=duration,
                 prior_context=policy.prior_context,
                 reference_images=refs,
+                transcript=transcript,
             )
-        except Exception as e:
-            logger.error(f"❌ Combined analysis FAILED: {e}", exc_info=True)
-            return AnalyzeResponse(status="error", error=f"[Combined Analysis] {e}")
+        ]
+        if has_speech and (transcript and transcript.full_text or policy.accumulated_transcript):
+            eval_tasks.append(evaluate_speech(
+                transcript=transcript,
+                speech_rules=speech_rules,
+                custom_prompt=policy.custom_prompt,
+                accumulated_transcript=policy.accumulated_transcript,
+            ))
+        report, *speech_results = await asyncio.gather(*eval_tasks, return_exceptions=True)
+        if isinstance(report, Exception):
+            logger.error(f"❌ Combined analysis FAILED: {report}", exc_info=report)
+            return AnalyzeResponse(status="error", error=f"[Combined Analysis] {report}")
+        speech_verdicts = speech_results[0] if speech_results else []
+        if isinstance(speech_verdicts, Exception):
+            logger.warning(f"Speech eval failed: {speech_verdicts}")
+            speech_verdicts = []
+        if speech_verdicts:
+            _add_speech_verdicts(report, speech_verdicts)
+        elif has_speech:
+            report.summary += " Note: No audio track detected."
 
         timings["combined"] = round(time.perf_counter() - t0, 2)
         _assign_person_thumbnails(report)
@@ -293,12 +347,8 @@ async def analyze_video(
     eval_tasks = {}
 
     if has_visual and observations:
-        visual_policy = Policy(
-            rules=visual_rules,
-            custom_prompt=policy.custom_prompt,
-            include_audio=False,
-            reference_images=policy.reference_images,
-        )
+        # model_copy keeps satisfied_rules, enabled_reference_ids etc.
+        visual_policy = policy.model_copy(update={"rules": visual_rules, "include_audio": False})
         eval_tasks["visual"] = evaluate_and_report(
             observations=observations,
             policy=visual_policy,
@@ -339,14 +389,7 @@ async def analyze_video(
 
     if visual_report and speech_verdicts:
         report = visual_report
-        report.all_verdicts.extend(speech_verdicts)
-        # Only incident-mode speech violations become incidents; checklist-mode are tracked separately
-        speech_incidents = [v for v in speech_verdicts if not v.compliant and v.mode == "incident"]
-        report.incidents.extend(speech_incidents)
-        non_compliant_speech = [v for v in speech_verdicts if not v.compliant]
-        if non_compliant_speech:
-            report.overall_compliant = False
-            report.summary += f" Speech: {len(non_compliant_speech)} audio violation(s)."
+        _add_speech_verdicts(report, speech_verdicts)
         report.transcript = transcript
     elif visual_report:
         report = visual_report
@@ -415,7 +458,7 @@ async def analyze_frame(request: FrameAnalyzeRequest):
 
     # --- Parse policy ---
     try:
-        policy = Policy(**json.loads(request.policy_json))
+        policy = Policy.model_validate_json(request.policy_json)
     except Exception as e:
         logger.error(f"❌ Invalid policy JSON: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid policy JSON: {e}")
@@ -444,7 +487,9 @@ async def analyze_frame(request: FrameAnalyzeRequest):
             logger.error(f"❌ DGX frame analysis FAILED: {e}", exc_info=True)
             return AnalyzeResponse(status="error", error=f"[DGX Frame Analysis] {e}")
     else:
-        # OpenAI path (default): send to GPT-4o-mini
+        # OpenAI path (default): send to GPT-4o-mini, at the same size and
+        # quality as sampled webcam chunks rather than whatever the client sent
+        image_b64 = await asyncio.to_thread(shrink_image_base64, image_b64)
         keyframe = KeyframeData(
             timestamp=0.0,
             frame_number=0,
@@ -454,9 +499,9 @@ async def analyze_frame(request: FrameAnalyzeRequest):
             image_base64=image_b64,
         )
 
-        enabled_refs = policy.enabled_reference_ids or []
+        enabled_refs = policy.enabled_reference_ids
         refs = (
-            [r for r in policy.reference_images if getattr(r, "id", None) and r.id in enabled_refs]
+            [r for r in policy.reference_images if r.id and r.id in enabled_refs]
             if enabled_refs else []
         )
 
@@ -538,7 +583,7 @@ async def analyze_frames_parallel(request: ParallelBatchRequest):
 
     # Parse policy
     try:
-        policy = Policy(**json.loads(request.policy_json))
+        policy = Policy.model_validate_json(request.policy_json)
     except Exception as e:
         logger.error(f"❌ Invalid policy JSON: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid policy JSON: {e}")
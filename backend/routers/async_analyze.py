@@ -1,9 +1,9 @@
 """Async analysis router with Celery task queue."""
 
 import os
-import json
 import uuid
-import shutil
+import asyncio
+import hashlib
 import logging
 from typing import Optional
 
@@ -12,12 +12,41 @@ from fastapi.responses import JSONResponse
 
 from backend.core.config import UPLOAD_DIR
 from backend.models.schemas import Policy
-from backend.services.celery_app import get_task_status, cancel_task
+from backend.services.celery_app import (
+    get_task_status, cancel_task, claim_idempotency_key, get_cached_result,
+)
 from backend.services.celery_tasks import analyze_video_async
+from backend.services.video import looks_like_video, VIDEO_HEADER_SIZE
 
 router = APIRouter(prefix="/async", tags=["async"])
 logger = logging.getLogger(__name__)
 
+# Upload is copied to disk in chunks of this size, hashing each chunk on the way.
+# Large blocks amortize the per-call overhead of hasher.update() and f.write().
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _advise_sequential(fileobj) -> None:
+    """Hint the kernel to read ahead on a spooled upload (no-op if in memory)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fileobj.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except (AttributeError, OSError, ValueError):
+        # In-memory SpooledTemporaryFile has no usable descriptor
+        pass
+
+
+def _save_and_hash(video: UploadFile, file_path: str) -> str:
+    """Stream the upload to disk and return a BLAKE2b digest of its bytes."""
+    hasher = hashlib.blake2b(digest_size=16)
+    _advise_sequential(video.file)
+    with open(file_path, "wb") as f:
+        while chunk := video.file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            f.write(chunk)
+    return hasher.hexdigest()
+
 
 @router.post("/analyze")
 async def start_async_analysis(
@@ -34,15 +63,20 @@ async def start_async_analysis(
     
     # Parse and validate policy
     try:
-        policy = Policy(**json.loads(policy_json))
+        policy = Policy.model_validate_json(policy_json)
         if not policy.rules and not policy.custom_prompt:
             raise ValueError("Policy must have at least one rule or custom prompt")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid policy: {e}")
     
-    # Validate video
-    if not video.content_type or not video.content_type.startswith("video/"):
-        raise HTTPException(status_code=400, detail=f"Expected video, got {video.content_type}")
+    # Validate video from its container magic bytes
+    head = video.file.read(VIDEO_HEADER_SIZE)
+    video.file.seek(0)
+    if not looks_like_video(head):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected video (MP4/MOV/WebM/MKV/AVI), got {video.content_type}",
+        )
     
     # Save video to disk
     os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -50,13 +84,41 @@ async def start_async_analysis(
     file_path = os.path.join(UPLOAD_DIR, file_id)
     
     try:
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(video.file, f)
+        video_digest = await asyncio.to_thread(_save_and_hash, video, file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save video: {e}")
     
+    # Idempotency key: same video bytes + same policy → same analysis
+    policy_digest = hashlib.blake2b(policy_json.encode(), digest_size=8).hexdigest()
+    idem_key = f"{video_digest}:{policy_digest}"
+    
+    cached = get_cached_result(idem_key)
+    if cached is not None:
+        os.remove(file_path)
+        logger.info(f"♻️ Returning cached result for {video.filename} ({idem_key})")
+        return {"task_id": None, "status": "complete", "cached": True, "result": cached}
+    
+    task_id = str(uuid.uuid4())
+    existing_task_id = claim_idempotency_key(idem_key, task_id)
+    if existing_task_id:
+        os.remove(file_path)
+        logger.info(f"♻️ Identical analysis already queued as {existing_task_id}")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "task_id": existing_task_id,
+                "status": "queued",
+                "message": "Identical analysis already in progress.",
+                "status_url": f"/async/status/{existing_task_id}",
+            }
+        )
+    
     # Queue the task
-    task = analyze_video_async.delay(file_path, policy_json)
+    task = analyze_video_async.apply_async(
+        args=(file_path, policy_json),
+        kwargs={"idem_key": idem_key},
+        task_id=task_id,
+    )
     
     logger.info(f"✅ Queued task {task.id} for {video.filename}")
     
@@ -0,0 +1,21 @@
+"""Serves keyframes published by services/image_host.py to OpenAI."""
+
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from backend.services import image_host
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+
+@router.get("/{name}")
+async def get_image(name: str, expires: int, sig: str):
+    """Return a hosted keyframe if its signed URL is valid and unexpired."""
+    if not image_host.verify(name, expires, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired image URL")
+    path = image_host.path_for(name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type="image/jpeg")
@@ -7,14 +7,14 @@ Uses GPT-4o-mini with structured output to ensure the response always includes
 a valid Policy object that can be directly applied in the UI.
 """
 
-import json
 import logging
 
+import orjson
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
 
 from backend.core.config import openai_client as client
-from backend.models.schemas import Policy
+from backend.models.schemas import Policy, PolicyRule
 
 router = APIRouter(prefix="/polly", tags=["polly"])
 logger = logging.getLogger(__name__)
@@ -150,33 +150,23 @@ User request: {req.message}"""
     raw = response.choices[0].message.content or "{}"
 
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
         return PollyResponse(
             message="Sorry, I had trouble processing that. Could you try rephrasing?",
             policy=req.current_policy,
             suggestions=["Try describing what you want to monitor", "Ask me to add a specific rule"],
         )
 
-    # Parse the policy, preserving reference_images and enabled_reference_ids from the current policy
+    # Parse the policy; model_copy keeps reference_images / enabled_reference_ids
+    # (and the other already-validated fields) from the current policy
     policy_data = data.get("policy", {})
-    updated_policy = Policy(
-        rules=[],
-        custom_prompt=policy_data.get("custom_prompt", ""),
-        include_audio=policy_data.get("include_audio", False),
-        reference_images=req.current_policy.reference_images,  # Preserve references
-        enabled_reference_ids=getattr(req.current_policy, "enabled_reference_ids", None) or [],
-    )
-
-    for r in policy_data.get("rules", []):
-        from backend.models.schemas import PolicyRule
-        updated_policy.rules.append(PolicyRule(
-            type=r.get("type", "custom"),
-            description=r.get("description", ""),
-            severity=r.get("severity", "high"),
-            frequency=r.get("frequency", "always"),
-            frequency_count=r.get("frequency_count", 1),
-        ))
+    new_rules = [PolicyRule.model_validate(r) for r in policy_data.get("rules", [])]
+    updated_policy = req.current_policy.model_copy(update={
+        "rules": new_rules,
+        "custom_prompt": policy_data.get("custom_prompt", ""),
+        "include_audio": policy_data.get("include_audio", False),
+    })
 
     return PollyResponse(
         message=data.get("message", "Policy updated."),
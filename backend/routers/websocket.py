@@ -1,9 +1,10 @@
 """WebSocket endpoints for real-time updates."""
 
-import json
 import asyncio
 import logging
-from typing import Dict, Set
+from typing import Dict, Optional, Set
+
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import redis.asyncio as aioredis
 
@@ -50,19 +51,19 @@ class ConnectionManager:
         logger.info(f"WebSocket disconnected for task {task_id}")
     
     async def send_update(self, task_id: str, data: dict):
-        """Send an update to all connections watching a task."""
+        """Send an update to all connections watching a task (concurrently)."""
         if task_id in self.active_connections:
-            disconnected = set()
-            for websocket in self.active_connections[task_id]:
-                try:
-                    await websocket.send_json(data)
-                except Exception as e:
-                    logger.warning(f"Failed to send update: {e}")
-                    disconnected.add(websocket)
+            websockets = list(self.active_connections[task_id])
+            results = await asyncio.gather(
+                *(ws.send_json(data) for ws in websockets),
+                return_exceptions=True,
+            )
             
             # Clean up disconnected sockets
-            for ws in disconnected:
-                self.active_connections[task_id].discard(ws)
+            for ws, result in zip(websockets, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to send update: {result}")
+                    self.active_connections[task_id].discard(ws)
     
     async def subscribe_to_updates(self, task_id: str):
         """Subscribe to Redis pub/sub for task updates."""
@@ -74,9 +75,9 @@ class ConnectionManager:
             async for message in pubsub.listen():
                 if message["type"] == "message":
                     try:
-                        data = json.loads(message["data"])
+                        data = orjson.loads(message["data"])
                         await self.send_update(task_id, data)
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         logger.warning(f"Invalid JSON in Redis message: {message['data']}")
                         
         except Exception as e:
@@ -135,6 +136,48 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         subscription_task.cancel()
         
         
+# Monitor dashboards share one broadcaster: stats are collected and encoded
+# once per tick, then the same frame is sent to every client.
+monitor_clients: Set[WebSocket] = set()
+_monitor_task: Optional[asyncio.Task] = None
+MONITOR_INTERVAL = 5.0
+
+
+def _collect_monitor_stats() -> dict:
+    """Gather queue + API usage stats for the monitor dashboards."""
+    from backend.services.celery_app import app
+    from backend.services.api_utils import get_usage_stats
+    
+    inspect = app.control.inspect()
+    
+    return {
+        "type": "queue_stats",
+        "active_tasks": len(inspect.active() or {}),
+        "scheduled_tasks": len(inspect.scheduled() or {}),
+        "api_usage": get_usage_stats(),
+        "timestamp": asyncio.get_running_loop().time(),
+    }
+
+
+async def _broadcast_monitor_stats():
+    """Send queue stats to all monitor clients every MONITOR_INTERVAL seconds."""
+    while monitor_clients:
+        try:
+            # Encode once per tick; text frames so browsers can JSON.parse them
+            frame = orjson.dumps(_collect_monitor_stats()).decode()
+            clients = list(monitor_clients)
+            results = await asyncio.gather(
+                *(ws.send_text(frame) for ws in clients),
+                return_exceptions=True,
+            )
+            for ws, result in zip(clients, results):
+                if isinstance(result, Exception):
+                    monitor_clients.discard(ws)
+        except Exception as e:
+            logger.error(f"Failed to send monitor update: {e}")
+        await asyncio.sleep(MONITOR_INTERVAL)
+
+
 @router.websocket("/monitor")
 async def monitor_endpoint(websocket: WebSocket):
     """
@@ -142,34 +185,23 @@ async def monitor_endpoint(websocket: WebSocket):
     
     Useful for admin dashboards to monitor overall system activity.
     """
+    global _monitor_task
+    
     await websocket.accept()
+    monitor_clients.add(websocket)
     logger.info("Monitor WebSocket connected")
     
+    if _monitor_task is None or _monitor_task.done():
+        _monitor_task = asyncio.create_task(_broadcast_monitor_stats())
+    
     try:
+        # Only read to detect disconnection; the broadcaster does the sending
         while True:
-            # Send queue stats every 5 seconds
-            try:
-                from backend.services.celery_app import app
-                from backend.services.api_utils import get_usage_stats
-                
-                inspect = app.control.inspect()
-                
-                stats = {
-                    "type": "queue_stats",
-                    "active_tasks": len(inspect.active() or {}),
-                    "scheduled_tasks": len(inspect.scheduled() or {}),
-                    "api_usage": get_usage_stats(),
-                    "timestamp": asyncio.get_event_loop().time(),
-                }
-                
-                await websocket.send_json(stats)
-                await asyncio.sleep(5)
-                
-            except Exception as e:
-                logger.error(f"Failed to send monitor update: {e}")
-                await asyncio.sleep(5)
+            await websocket.receive_text()
                 
     except WebSocketDisconnect:
         logger.info("Monitor WebSocket disconnected")
     except Exception as e:
-        logger.error(f"Monitor WebSocket error: {e}")
\ No newline at end of file
+        logger.error(f"Monitor WebSocket error: {e}")
+    finally:
+        monitor_clients.discard(websocket)
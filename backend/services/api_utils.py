@@ -2,16 +2,46 @@
 
 import asyncio
 import logging
+import os
+import random
+import re
 import time
+import weakref
 from typing import Any, Callable, Optional, TypeVar, Dict
-from functools import wraps
-import json
+from functools import lru_cache, wraps
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
-# Global usage tracker (in production, use Redis or database)
+# Shared RNG for retry jitter
+_rng = random.Random()
+
+# Error substrings (lowercase) that mean retrying cannot help — one-pass match
+_NON_RETRYABLE_RE = re.compile(
+    "invalid api key|authentication|insufficient_quota|invalid_request|content_policy_violation"
+)
+
+# Shared usage/rate-limit counters in Redis (optional — same URL as Celery)
+try:
+    import redis
+    _redis = redis.from_url(
+        os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        # Called from the event loop: a hung server must not block it for long
+        socket_timeout=0.5,
+    )
+except ImportError:
+    _redis = None
+
+# After a Redis error, use the in-memory fallback for this long, then retry
+REDIS_RETRY_AFTER = 30.0
+_redis_down_until = 0.0
+
+USAGE_SERVICES_KEY = "usage:services"
+
+# In-memory fallback tracker when Redis is not installed/reachable
 usage_tracker: Dict[str, Dict[str, Any]] = {}
 
 class APIError(Exception):
@@ -22,6 +52,17 @@ class RateLimitError(APIError):
     """Raised when rate limit is exceeded."""
     pass
 
+@lru_cache(maxsize=32)
+def _backoff_schedule(
+    initial_delay: float, exponential_base: float, max_delay: float, max_retries: int,
+) -> tuple:
+    """Retry delays before jitter — deterministic, so computed once per setting."""
+    return tuple(
+        min(initial_delay * exponential_base ** i, max_delay)
+        for i in range(max_retries)
+    )
+
+
 async def exponential_backoff_retry(
     func: Callable,
     max_retries: int = 3,
@@ -49,7 +90,6 @@ async def exponential_backoff_retry(
     Raises:
         Last exception if all retries fail
     """
-    delay = initial_delay
     last_exception = None
     
     for attempt in range(max_retries + 1):
@@ -67,25 +107,17 @@ async def exponential_backoff_retry(
             last_exception = e
             
             # Check if error is retryable
-            error_msg = str(e).lower()
-            non_retryable = [
-                "invalid api key",
-                "authentication",
-                "insufficient_quota",
-                "invalid_request",
-                "content_policy_violation",
-            ]
-            
-            if any(term in error_msg for term in non_retryable):
+            if _NON_RETRYABLE_RE.search(str(e).lower()) is not None:
                 logger.error(f"❌ {service_name} non-retryable error: {e}")
                 raise
             
             if attempt < max_retries:
                 # Add jitter to prevent thundering herd
-                actual_delay = delay
+                actual_delay = _backoff_schedule(
+                    initial_delay, exponential_base, max_delay, max_retries
+                )[attempt]
                 if jitter:
-                    import random
-                    actual_delay = delay * (0.5 + random.random())
+                    actual_delay *= 0.5 + _rng.random()
                 
                 logger.warning(
                     f"⚠️ {service_name} attempt {attempt + 1}/{max_retries + 1} failed: {e}. "
@@ -93,15 +125,53 @@ async def exponential_backoff_retry(
                 )
                 
                 await asyncio.sleep(actual_delay)
-                
-                # Exponential backoff
-                delay = min(delay * exponential_base, max_delay)
             else:
                 logger.error(f"❌ {service_name} failed after {max_retries} retries: {e}")
     
     raise last_exception
 
 
+def _redis_failed(e: Exception) -> None:
+    """Back off from Redis for REDIS_RETRY_AFTER seconds and fall back to in-memory."""
+    global _redis_down_until
+    logger.warning(
+        f"⚠️ Usage tracking falling back to in-memory, caching paused for "
+        f"{REDIS_RETRY_AFTER:.0f}s (Redis error: {e})"
+    )
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+
+def _redis_client():
+    """The Redis client, or None if not installed or backing off after an error."""
+    if _redis is None or time.monotonic() < _redis_down_until:
+        return None
+    return _redis
+
+
+def cache_get_many(keys: list) -> list:
+    """MGET from the shared Redis cache; every key misses when Redis is unavailable."""
+    client = _redis_client()
+    if client is not None and keys:
+        try:
+            return client.mget(keys)
+        except redis.RedisError as e:
+            _redis_failed(e)
+    return [None] * len(keys)
+
+
+def cache_set_many(items: Dict[str, str], ttl: int) -> None:
+    """SETEX each item in one round trip (no-op without Redis)."""
+    client = _redis_client()
+    if client is not None and items:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, value)
+            pipe.execute()
+        except redis.RedisError as e:
+            _redis_failed(e)
+
+
 def track_usage(
     service: str,
     tokens: Optional[int] = None,
@@ -111,9 +181,24 @@ def track_usage(
     """
     Track API usage for billing and monitoring.
     
-    In production, this would write to Redis/PostgreSQL.
-    For hackathon, we'll use in-memory tracking.
+    Counters live in a Redis hash (usage:{service}) so they are shared by every
+    Uvicorn and Celery worker. Falls back to in-memory tracking without Redis.
     """
+    client = _redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(f"usage:{service}", "total_calls", 1)
+            if tokens:
+                pipe.hincrby(f"usage:{service}", "total_tokens", tokens)
+            if cost:
+                pipe.hincrbyfloat(f"usage:{service}", "total_cost", cost)
+            pipe.sadd(USAGE_SERVICES_KEY, service)
+            pipe.execute()
+            return
+        except redis.RedisError as e:
+            _redis_failed(e)
+    
     timestamp = time.time()
     
     if service not in usage_tracker:
@@ -161,6 +246,21 @@ def track_usage(
     )
 
 
+# Process-wide cap on in-flight LLM requests, so bursts of concurrent chunks
+# queue here instead of piling up 429s (asyncio primitives are per event loop)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+_llm_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def llm_slot() -> asyncio.Semaphore:
+    """Semaphore every LLM request holds while in flight (LLM_MAX_CONCURRENCY slots)."""
+    loop = asyncio.get_running_loop()
+    slots = _llm_slots.get(loop)
+    if slots is None:
+        slots = _llm_slots[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return slots
+
+
 def check_rate_limit(
     service: str,
     max_per_minute: int = 60,
@@ -169,9 +269,36 @@ def check_rate_limit(
     """
     Check if rate limit would be exceeded.
     
+    With Redis this is an atomic fixed-window counter: each check INCRs
+    rl:{service}:{minute} and rl:{service}:h:{hour}, so the limit holds across
+    all workers.
+    
     Returns:
         True if within limits, False if exceeded
     """
+    client = _redis_client()
+    if client is not None:
+        now = time.time()
+        minute_key = f"rl:{service}:{int(now / 60)}"
+        hour_key = f"rl:{service}:h:{int(now / 3600)}"
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.incr(minute_key)
+            pipe.expire(minute_key, 300)  # Kept 5 min for get_usage_stats recent_calls
+            pipe.incr(hour_key)
+            pipe.expire(hour_key, 3600)
+            calls_this_minute, _, calls_this_hour, _ = pipe.execute()
+        except redis.RedisError as e:
+            _redis_failed(e)
+        else:
+            if calls_this_minute > max_per_minute:
+                logger.warning(f"⚠️ {service} rate limit: {calls_this_minute}/{max_per_minute} per minute")
+                return False
+            if calls_this_hour > max_per_hour:
+                logger.warning(f"⚠️ {service} rate limit: {calls_this_hour}/{max_per_hour} per hour")
+                return False
+            return True
+    
     if service not in usage_tracker:
         return True
     
@@ -203,6 +330,29 @@ def check_rate_limit(
 
 def get_usage_stats() -> Dict[str, Any]:
     """Get current usage statistics for all services."""
+    client = _redis_client()
+    if client is not None:
+        try:
+            services = sorted(client.smembers(USAGE_SERVICES_KEY))
+            current_minute = int(time.time() / 60)
+            pipe = client.pipeline(transaction=False)
+            for service in services:
+                pipe.hgetall(f"usage:{service}")
+                pipe.mget([f"rl:{service}:{current_minute - i}" for i in range(5)])
+            replies = pipe.execute()
+        except redis.RedisError as e:
+            _redis_failed(e)
+        else:
+            stats = {}
+            for service, data, recent in zip(services, replies[0::2], replies[1::2]):
+                stats[service] = {
+                    "total_calls": int(data.get("total_calls", 0)),
+                    "total_tokens": int(data.get("total_tokens", 0)),
+                    "total_cost": round(float(data.get("total_cost", 0.0)), 4),
+                    "recent_calls": sum(int(c) for c in recent if c),
+                }
+            return stats
+    
     stats = {}
     for service, data in usage_tracker.items():
         stats[service] = {
@@ -228,6 +378,7 @@ def estimate_cost(
     pricing = {
         "gpt-4o": {"input": 0.00250, "output": 0.01000},  # per 1K tokens
         "gpt-4o-mini": {"input": 0.00015, "output": 0.00060},
+        "gpt-4.1-nano": {"input": 0.00010, "output": 0.00040},
         "whisper": {"per_minute": 0.006},
         "gpt-4-vision": {"input": 0.01, "output": 0.03},
     }
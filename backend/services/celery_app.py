@@ -1,13 +1,14 @@
 """Celery configuration and task definitions for async video processing."""
 
 import os
-import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from celery import Celery, Task
+from celery.signals import worker_process_init
 from celery.result import AsyncResult
 import redis
 import asyncio
+import orjson
 
 # Configure Celery
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -31,15 +32,41 @@ app.conf.update(
     task_time_limit=300,  # 5 minute hard limit per task
     task_soft_time_limit=240,  # 4 minute soft limit
     worker_prefetch_multiplier=1,  # Process one task at a time
-    worker_max_tasks_per_child=50,  # Restart worker after 50 tasks to prevent memory leaks
+    # Recycle a worker child only when its RSS exceeds ~1.5 GB (value in KB).
+    # A fixed task-count recycle forced a cold reimport of cv2/numpy/openai
+    # every N tasks even when nothing leaked.
+    worker_max_memory_per_child=1_500_000,
+    # Long-video stages run on separate workers: VLM on "gpu", Whisper on "cpu".
+    # A single worker can serve everything with `-Q celery,gpu,cpu`.
+    task_routes={
+        "extract_keyframes_task": {"queue": "cpu"},
+        "analyze_frames_task": {"queue": "gpu"},
+        "transcribe_video_task": {"queue": "cpu"},
+    },
 )
 
 # Redis client for real-time updates
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
+# Idempotency: identical video+policy submissions share one task / result
+IDEMPOTENCY_TTL = 3600  # idem:{key} → task_id, while the task is in flight
+RESULT_CACHE_TTL = 86400  # result:{key} → task result JSON
+
 logger = logging.getLogger(__name__)
 
 
+@worker_process_init.connect
+def _preload_heavy_modules(**kwargs):
+    """Import the heavy pipeline modules when a worker child starts.
+
+    Keeps the first task after a (re)spawn from paying the cv2/openai import cost.
+    """
+    import cv2  # noqa: F401
+    import numpy  # noqa: F401
+    from backend.services import video, vlm, policy  # noqa: F401
+    logger.info("Worker process initialized (pipeline modules preloaded)")
+
+
 class CallbackTask(Task):
     """Base task with callbacks for progress updates."""
     
@@ -48,6 +75,10 @@ class CallbackTask(Task):
         logger.info(f"Task {task_id} completed successfully")
         # Store completion status in Redis
         redis_client.setex(f"task:{task_id}:status", 3600, "complete")
+        # Cache the result for later identical submissions
+        idem_key = kwargs.get("idem_key")
+        if idem_key:
+            redis_client.setex(f"result:{idem_key}", RESULT_CACHE_TTL, orjson.dumps(retval))
         
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Called on task failure."""
@@ -55,6 +86,29 @@ class CallbackTask(Task):
         # Store error in Redis
         redis_client.setex(f"task:{task_id}:status", 3600, "failed")
         redis_client.setex(f"task:{task_id}:error", 3600, str(exc))
+        # Release the idempotency claim so the same upload can be retried
+        idem_key = kwargs.get("idem_key")
+        if idem_key:
+            redis_client.delete(f"idem:{idem_key}")
+
+
+def claim_idempotency_key(idem_key: str, task_id: str) -> Optional[str]:
+    """Atomically claim an idempotency key for a new task (SETNX).
+
+    Returns:
+        None if the claim succeeded, otherwise the task_id that already owns the key.
+    """
+    if redis_client.set(f"idem:{idem_key}", task_id, nx=True, ex=IDEMPOTENCY_TTL):
+        # Reverse mapping so cancel_task can release the claim
+        redis_client.setex(f"task:{task_id}:idem", IDEMPOTENCY_TTL, idem_key)
+        return None
+    return redis_client.get(f"idem:{idem_key}")
+
+
+def get_cached_result(idem_key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored result of a previous identical analysis, if any."""
+    cached = redis_client.get(f"result:{idem_key}")
+    return orjson.loads(cached) if cached else None
 
 
 def update_task_progress(task_id: str, stage: str, progress: int, message: str = ""):
@@ -64,8 +118,9 @@ def update_task_progress(task_id: str, stage: str, progress: int, message: str =
         "progress": progress,
         "message": message,
     }
-    redis_client.setex(f"task:{task_id}:progress", 300, json.dumps(data))
-    redis_client.publish(f"task:{task_id}:updates", json.dumps(data))
+    payload = orjson.dumps(data)
+    redis_client.setex(f"task:{task_id}:progress", 300, payload)
+    redis_client.publish(f"task:{task_id}:updates", payload)
 
 
 def get_task_status(task_id: str) -> Dict[str, Any]:
@@ -74,7 +129,7 @@ def get_task_status(task_id: str) -> Dict[str, Any]:
     
     # Get progress from Redis
     progress_data = redis_client.get(f"task:{task_id}:progress")
-    progress = json.loads(progress_data) if progress_data else {}
+    progress = orjson.loads(progress_data) if progress_data else {}
     
     # Get error if any
     error = redis_client.get(f"task:{task_id}:error")
@@ -94,9 +149,22 @@ def get_task_status(task_id: str) -> Dict[str, Any]:
     return status
 
 
+def release_idempotency_key(task_id: str) -> None:
+    """Drop the idempotency claim held by task_id, if it still holds one."""
+    idem_key = redis_client.get(f"task:{task_id}:idem")
+    if idem_key and redis_client.get(f"idem:{idem_key}") == task_id:
+        redis_client.delete(f"idem:{idem_key}")
+
+
 def cancel_task(task_id: str) -> bool:
-    """Cancel a running task."""
+    """Cancel a running task.
+
+    Revoking with terminate doesn't run CallbackTask.on_failure, so the
+    idempotency claim is released here; otherwise identical resubmissions
+    would be handed the cancelled task_id until the claim expires.
+    """
     result = AsyncResult(task_id, app=app)
     result.revoke(terminate=True)
     redis_client.setex(f"task:{task_id}:status", 3600, "cancelled")
+    release_idempotency_key(task_id)
     return True
\ No newline at end of file
@@ -1,33 +1,69 @@
 """Celery tasks for async video processing."""
 
 import os
-import json
 import time
 import logging
 import asyncio
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-from celery import current_task
+from celery import chain, chord, current_task
+from celery.signals import worker_shutdown
 
 from backend.services.celery_app import app, CallbackTask, update_task_progress
 from backend.core.config import UPLOAD_DIR, KEYFRAMES_DIR
-from backend.models.schemas import Policy, Report, AnalyzeResponse
-from backend.services.video import process_video
+from backend.models.schemas import (
+    Policy, Report, AnalyzeResponse, KeyframeData, FrameObservation, TranscriptResult,
+)
+from backend.services.video import process_video_cached, generate_video_id, get_video_metadata
 from backend.services.vlm import analyze_frames
-from backend.services.policy import evaluate_and_report, analyze_and_evaluate_combined
+from backend.services.policy import evaluate_and_report, analyze_and_evaluate_combined, COMBINED_MAX_DURATION
 from backend.services.whisper import transcribe_video
 from backend.services.speech_policy import evaluate_speech
 
 logger = logging.getLogger(__name__)
 
+CLEANUP_WORKERS = 8  # Threads used by cleanup_old_files to delete stale trees
+
+# One long-lived event loop per worker process, running in its own thread.
+# Reusing it keeps the shared AsyncOpenAI client's connection pool (TLS
+# keep-alive) alive across tasks instead of rebuilding it per loop.
+# Created lazily: threads don't survive the prefork pool's fork().
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="celery-asyncio", daemon=True).start()
+    return _LOOP
+
+
+def _run_async(coro):
+    """Run a coroutine on the worker's persistent loop and wait for the result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+@worker_shutdown.connect
+def _stop_loop(**kwargs):
+    if _LOOP is not None:
+        _LOOP.call_soon_threadsafe(_LOOP.stop)
+
 
 @app.task(bind=True, base=CallbackTask, name="analyze_video_async")
-def analyze_video_async(self, file_path: str, policy_json: str) -> Dict[str, Any]:
+def analyze_video_async(self, file_path: str, policy_json: str, idem_key: str = None) -> Dict[str, Any]:
     """
     Async video analysis task.
     
     Args:
         file_path: Path to the video file
         policy_json: JSON string of the Policy object
+        idem_key: Idempotency key (video + policy hash); the result is cached
+            under it by CallbackTask.on_success
         
     Returns:
         Dictionary with analysis results
@@ -37,49 +73,48 @@ def analyze_video_async(self, file_path: str, policy_json: str) -> Dict[str, Any
     
     try:
         # Parse policy
-        policy = Policy(**json.loads(policy_json))
+        policy = Policy.model_validate_json(policy_json)
         update_task_progress(task_id, "parsing", 5, "Policy parsed")
         
-        # Stage 1: Frame extraction
-        update_task_progress(task_id, "extracting", 10, "Extracting keyframes...")
-        video_result = process_video(file_path=file_path, keyframes_dir=KEYFRAMES_DIR)
-        
-        if not video_result.keyframes:
-            raise ValueError("No keyframes extracted from video")
-            
-        update_task_progress(
-            task_id, "extracting", 30, 
-            f"Extracted {len(video_result.keyframes)} keyframes"
-        )
-        
-        duration = video_result.metadata.get("duration", 0.0)
-        
         # Split rules
         visual_rules = [r for r in policy.rules if r.type != "speech"]
         speech_rules = [r for r in policy.rules if r.type == "speech"]
         has_visual = bool(visual_rules) or bool(policy.custom_prompt)
         has_speech = bool(speech_rules)
         
-        # Short video: use combined analysis
-        if duration < 15.0 and has_visual and not has_speech:
+        # Duration from container metadata decides the path before any decoding
+        duration = get_video_metadata(file_path).get("duration", 0.0)
+        
+        # Short video: use combined analysis (no separate VLM stage)
+        if duration < COMBINED_MAX_DURATION and has_visual:
+            # Stage 1: Frame extraction
+            update_task_progress(task_id, "extracting", 10, "Extracting keyframes...")
+            video_result = process_video_cached(file_path=file_path, keyframes_dir=KEYFRAMES_DIR)
+            
+            if not video_result.keyframes:
+                raise ValueError("No keyframes extracted from video")
+                
+            update_task_progress(
+                task_id, "extracting", 30, 
+                f"Extracted {len(video_result.keyframes)} keyframes"
+            )
+            transcript = None
+            if has_speech or policy.include_audio:
+                update_task_progress(task_id, "transcribing", 40, "Transcribing audio...")
+                try:
+                    transcript = _run_async(transcribe_video(file_path))
+                except Exception as e:
+                    logger.warning(f"Whisper stage failed (non-fatal): {e}")
+
             update_task_progress(task_id, "analyzing", 50, "Analyzing frames...")
             
-            # Run async function in sync context
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                report = loop.run_until_complete(
-                    analyze_and_evaluate_combined(
-                        keyframes=video_result.keyframes,
-                        policy=policy,
-                        video_id=video_result.video_id,
-                        video_duration=duration,
-                        prior_context=policy.prior_context,
-                        reference_images=policy.reference_images,
-                    )
+            report, speech_verdicts = _run_async(
+                _evaluate_combined_and_speech(
+                    video_result.keyframes, policy, video_result.video_id, duration,
+                    transcript, speech_rules,
                 )
-            finally:
-                loop.close()
+            )
+            _merge_speech_verdicts(report, speech_verdicts)
                 
             update_task_progress(task_id, "complete", 100, "Analysis complete")
             
@@ -91,81 +126,194 @@ def analyze_video_async(self, file_path: str, policy_json: str) -> Dict[str, Any
                 "frames_analyzed": len(video_result.keyframes),
             }
         
-        # Long video: multi-stage pipeline
+        # Long video: fan out to separate workers and finish in a chord
+        # callback. Extraction -> VLM is one chained branch (cpu, then gpu
+        # queue); Whisper is a second branch, so transcription overlaps
+        # extraction instead of waiting for it. replace() hands this task's
+        # id to the callback, so status polling and result caching still work.
+        update_task_progress(task_id, "extracting", 10, "Extracting keyframes...")
+        
+        header = []
+        if has_visual:
+            header.append(chain(
+                extract_keyframes_task.s(file_path, task_id),
+                analyze_frames_task.s(policy_json),
+            ))
+        if has_speech or policy.include_audio:
+            header.append(transcribe_video_task.s(file_path))
+        if not header:
+            raise ValueError("No observations to evaluate")
+            
+        video_info = {
+            "video_id": generate_video_id(file_path),
+            "duration": duration,
+        }
+        pipeline = chord(header, finalize_report_task.s(
+            policy_json, video_info, idem_key=idem_key,
+        ))
+        
+    except Exception as e:
+        logger.error(f"Task {task_id} failed: {e}", exc_info=True)
+        update_task_progress(task_id, "error", 0, str(e))
+        raise
+        
+    return self.replace(pipeline)
+
+
+@app.task(name="extract_keyframes_task")
+def extract_keyframes_task(file_path: str, progress_id: str) -> list:
+    """Chord header, first link: keyframe extraction (routed to the cpu queue).
+
+    Failures return no keyframes instead of raising: a failed header task
+    would fail the chord without running finalize_report_task, leaving the
+    progress stuck and the idempotency key claimed. With no observations the
+    callback raises, and CallbackTask.on_failure releases the claim.
+    """
+    try:
+        video_result = process_video_cached(file_path=file_path, keyframes_dir=KEYFRAMES_DIR)
+    except Exception as e:
+        logger.error(f"Keyframe extraction failed: {e}", exc_info=True)
+        update_task_progress(progress_id, "error", 0, f"Keyframe extraction failed: {e}")
+        return []
+    update_task_progress(
+        progress_id, "analyzing", 40,
+        f"Extracted {len(video_result.keyframes)} keyframes, analyzing visual content...",
+    )
+    return [kf.model_dump() for kf in video_result.keyframes]
+
+
+@app.task(name="analyze_frames_task")
+def analyze_frames_task(keyframes: list, policy_json: str) -> tuple:
+    """Chord header: VLM observations for the keyframes (routed to the gpu queue)."""
+    policy = Policy.model_validate_json(policy_json)
+    keyframes = [KeyframeData(**kf) for kf in keyframes]
+    try:
+        observations = _run_async(analyze_frames(keyframes, policy))
+    except Exception as e:
+        logger.error(f"VLM stage failed: {e}", exc_info=True)
         observations = []
+    return ("vlm", [obs.model_dump() for obs in observations])
+
+
+@app.task(name="transcribe_video_task")
+def transcribe_video_task(file_path: str) -> tuple:
+    """Chord header: Whisper transcript of the video (routed to the cpu queue)."""
+    try:
+        transcript = _run_async(transcribe_video(file_path))
+    except Exception as e:
+        logger.warning(f"Whisper stage failed (non-fatal): {e}")
         transcript = None
+    return ("whisper", transcript.model_dump() if transcript else None)
+
+
+async def _evaluate_visual_and_speech(
+    observations, visual_policy: Policy, policy: Policy, video_id: str,
+    duration: float, transcript, speech_rules: list,
+):
+    """Stage 3 as one coroutine: visual report and speech verdicts run concurrently."""
+    visual = evaluate_and_report(
+        observations=observations,
+        policy=visual_policy,
+        video_id=video_id,
+        video_duration=duration,
+        transcript=transcript,
+        prior_context=policy.prior_context,
+    )
+    if not (speech_rules and transcript and transcript.full_text):
+        return await visual, []
+    return await asyncio.gather(
+        visual,
+        evaluate_speech(
+            transcript=transcript,
+            speech_rules=speech_rules,
+            custom_prompt=policy.custom_prompt,
+        ),
+    )
+
+
+async def _evaluate_combined_and_speech(
+    keyframes: list, policy: Policy, video_id: str, duration: float,
+    transcript, speech_rules: list,
+):
+    """Short-video path as one coroutine: combined report and speech verdicts run concurrently."""
+    visual_policy = policy.model_copy(update={"rules": [r for r in policy.rules if r.type != "speech"]})
+    visual = analyze_and_evaluate_combined(
+        keyframes=keyframes,
+        policy=visual_policy,
+        video_id=video_id,
+        video_duration=duration,
+        prior_context=policy.prior_context,
+        reference_images=policy.reference_images,
+        transcript=transcript,
+    )
+    if not (speech_rules and transcript and transcript.full_text):
+        return await visual, []
+    return await asyncio.gather(
+        visual,
+        evaluate_speech(
+            transcript=transcript,
+            speech_rules=speech_rules,
+            custom_prompt=policy.custom_prompt,
+        ),
+    )
+
+
+def _merge_speech_verdicts(report, speech_verdicts: list) -> None:
+    """Add speech verdicts to a visual report in place."""
+    if not speech_verdicts:
+        return
+    report.all_verdicts.extend(speech_verdicts)
+    speech_incidents = [v for v in speech_verdicts if not v.compliant]
+    report.incidents.extend(speech_incidents)
+    if speech_incidents:
+        report.overall_compliant = False
+
+
+@app.task(bind=True, base=CallbackTask, name="finalize_report_task")
+def finalize_report_task(
+    self, stage_results: list, policy_json: str, video_info: dict, idem_key: str = None,
+) -> Dict[str, Any]:
+    """Chord callback: policy evaluation over the VLM + Whisper stage outputs."""
+    task_id = self.request.id
+    
+    try:
+        policy = Policy.model_validate_json(policy_json)
+        results = dict(stage_results)
+        observations = [FrameObservation(**o) for o in results.get("vlm") or []]
+        transcript = TranscriptResult(**results["whisper"]) if results.get("whisper") else None
         
-        # Stage 2: VLM + Whisper in parallel
-        update_task_progress(task_id, "analyzing", 40, "Analyzing visual content...")
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            tasks = []
-            if has_visual:
-                tasks.append(analyze_frames(video_result.keyframes, policy))
-            if has_speech or policy.include_audio:
-                tasks.append(transcribe_video(file_path))
-                
-            if tasks:
-                results = loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
-                
-                if has_visual and not isinstance(results[0], Exception):
-                    observations = results[0]
+        visual_rules = [r for r in policy.rules if r.type != "speech"]
+        speech_rules = [r for r in policy.rules if r.type == "speech"]
+        has_visual = bool(visual_rules) or bool(policy.custom_prompt)
+        has_speech = bool(speech_rules)
+        video_id = video_info["video_id"]
+        duration = video_info["duration"]
                     
-                if (has_speech or policy.include_audio) and len(results) > 1:
-                    if not isinstance(results[1], Exception):
-                        transcript = results[1]
-                        
-            update_task_progress(task_id, "evaluating", 70, "Evaluating compliance...")
-            
-            # Stage 3: Policy evaluation
-            if has_visual and observations:
-                visual_policy = Policy(
-                    rules=visual_rules,
-                    custom_prompt=policy.custom_prompt,
-                    include_audio=False,
-                    reference_images=policy.reference_images,
-                )
-                report = loop.run_until_complete(
-                    evaluate_and_report(
-                        observations=observations,
-                        policy=visual_policy,
-                        video_id=video_result.video_id,
-                        video_duration=duration,
-                        transcript=transcript,
-                        prior_context=policy.prior_context,
-                    )
+        update_task_progress(task_id, "evaluating", 70, "Evaluating compliance...")
+        
+        # Stage 3: Policy evaluation
+        if has_visual and observations:
+            # model_copy keeps satisfied_rules, enabled_reference_ids etc.
+            visual_policy = policy.model_copy(update={"rules": visual_rules, "include_audio": False})
+            report, speech_verdicts = _run_async(
+                _evaluate_visual_and_speech(
+                    observations, visual_policy, policy, video_id, duration,
+                    transcript, speech_rules if has_speech else [],
                 )
-                
-                # Add speech verdicts if any
-                if has_speech and transcript and transcript.full_text:
-                    speech_verdicts = loop.run_until_complete(
-                        evaluate_speech(
-                            transcript=transcript,
-                            speech_rules=speech_rules,
-                            custom_prompt=policy.custom_prompt,
-                        )
-                    )
-                    if speech_verdicts:
-                        report.all_verdicts.extend(speech_verdicts)
-                        speech_incidents = [v for v in speech_verdicts if not v.compliant]
-                        report.incidents.extend(speech_incidents)
-                        if speech_incidents:
-                            report.overall_compliant = False
-                            
-            else:
-                raise ValueError("No observations to evaluate")
-                
-        finally:
-            loop.close()
+            )
+            
+            # Add speech verdicts if any
+            _merge_speech_verdicts(report, speech_verdicts)
+                        
+        else:
+            raise ValueError("No observations to evaluate")
             
         update_task_progress(task_id, "complete", 100, "Analysis complete")
         
         return {
             "status": "complete",
             "report": report.model_dump(),
-            "video_id": video_result.video_id,
+            "video_id": video_id,
             "duration": duration,
             "frames_analyzed": len(observations),
         }
@@ -176,26 +324,36 @@ def analyze_video_async(self, file_path: str, policy_json: str) -> Dict[str, Any
         raise
 
 
+def _delete_if_stale(entry: os.DirEntry, cutoff_time: float) -> None:
+    """Remove a file or directory tree if it is older than cutoff_time."""
+    try:
+        if entry.stat().st_mtime >= cutoff_time:
+            return
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+        logger.info(f"Cleaned up old file/directory: {entry.path}")
+    except Exception as e:
+        logger.error(f"Failed to clean up {entry.path}: {e}")
+
+
 @app.task(name="cleanup_old_files")
 def cleanup_old_files():
-    """Periodic task to clean up old upload and keyframe files."""
-    import shutil
-    from datetime import datetime, timedelta
-    
+    """Periodic task to clean up old upload and keyframe files.
+
+    Deletions fan out over a thread pool — rmtree is syscall-bound and
+    releases the GIL, so stale keyframe trees are removed in parallel.
+    """
     cutoff_time = time.time() - (24 * 3600)  # 24 hours ago
     
-    for directory in [UPLOAD_DIR, KEYFRAMES_DIR]:
-        if not os.path.exists(directory):
-            continue
-            
-        for item in os.listdir(directory):
-            item_path = os.path.join(directory, item)
-            if os.path.getmtime(item_path) < cutoff_time:
-                try:
-                    if os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                    else:
-                        os.remove(item_path)
-                    logger.info(f"Cleaned up old file/directory: {item_path}")
-                except Exception as e:
-                    logger.error(f"Failed to clean up {item_path}: {e}")
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as pool:
+        for directory in [UPLOAD_DIR, KEYFRAMES_DIR]:
+            if not os.path.isdir(directory):
+                continue
+                
+            # scandir's DirEntry caches stat()/is_dir() from the directory read
+            with os.scandir(directory) as it:
+                entries = list(it)
+            for entry in entries:
+                pool.submit(_delete_if_stale, entry, cutoff_time)
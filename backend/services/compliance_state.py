@@ -3,118 +3,305 @@
 Manages the state of checklist-mode rules to prevent spam.
 When a checklist rule is satisfied, it remains compliant for the validity duration.
 
-State is persisted to a JSON file so it survives server restarts.
+State is persisted in SQLite (WAL journal mode) so it survives server
+restarts: each mutation is a single row upsert, and people are loaded into
+an in-memory LRU lazily on lookup instead of at startup.
 """
 
-import json
+import heapq
 import logging
 import os
+import sqlite3
 import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
-import hashlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+import xxhash
 
 from backend.models.schemas import PolicyRule, ChecklistState, ChecklistItem
 
 logger = logging.getLogger(__name__)
 
-# Persistence file path — stored alongside the backend module
+# Persistence files — stored alongside the backend module
+_DB_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "compliance_state.db"
+)
+# Pre-SQLite JSON snapshot; imported once when the database is first created
 _STATE_FILE = os.path.join(
     os.path.dirname(__file__), "..", "..", "compliance_state.json"
 )
 
+# Number of lock stripes; people hash onto a shard, each with its own lock
+SHARD_COUNT = 16
+
+# In-memory LRU of people's states, split evenly across the shards. Entries
+# older than PERSON_CACHE_TTL seconds are re-read from SQLite so writes made
+# by other processes (API workers, Celery) show up.
+PERSON_CACHE_SIZE = 4096
+PERSON_CACHE_TTL = 5.0
+_SHARD_CACHE_SIZE = max(1, PERSON_CACHE_SIZE // SHARD_COUNT)
+
+# Re-verifying a compliant rule within this many seconds is not written through
+REFRESH_TOLERANCE = 5.0
+
+# Stored in PRAGMA user_version; 0 means a fresh database
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checklist_state (
+    person_id        TEXT NOT NULL,
+    rule_hash        TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    last_verified_ts REAL,
+    expires_at_ts    REAL,
+    PRIMARY KEY (person_id, rule_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_checklist_state_expiry
+    ON checklist_state (expires_at_ts) WHERE expires_at_ts IS NOT NULL;
+"""
+
+_UPSERT_SQL = "INSERT OR REPLACE INTO checklist_state VALUES (?, ?, ?, ?, ?)"
+
+# Many persisted states share timestamps (one update stamps every person)
+_parse_iso = lru_cache(maxsize=4096)(datetime.fromisoformat)
+
+
+@lru_cache(maxsize=4096)
+def _from_ts(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _to_ts(value) -> Optional[float]:
+    """Epoch seconds from an exported value (float, or ISO string in legacy files)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_iso(value).timestamp()
+
+
+@lru_cache(maxsize=8192)
+def _rule_hash(description: str) -> str:
+    """Short stable key for a rule description (xxh3 — far cheaper than MD5)."""
+    return xxhash.xxh3_64_hexdigest(description.encode())[:8]
+
 
 class ComplianceStateTracker:
     """Tracks compliance state for checklist-mode rules.
-    
+
     This prevents spam by remembering when rules were satisfied.
     For example, if someone shows their badge, we remember it for 8 hours.
-    
-    State is automatically persisted to disk on every update and loaded on startup.
-    Thread-safe via a reentrant lock.
+
+    SQLite is the source of truth; every mutation is written through as one
+    row upsert. The in-memory shards are a bounded LRU of people that have
+    been looked up, refreshed from SQLite after PERSON_CACHE_TTL.
+
+    Thread-safe via striped locking: people are sharded by hash(person_id)
+    across SHARD_COUNT buckets, each with its own reentrant lock, so updates
+    for different people don't contend. A small global lock guards the expiry
+    heap; lock order is always shard(s) in index order, then global. Each
+    thread (and forked worker process) uses its own SQLite connection.
     """
-    
-    def __init__(self, state_file: str = _STATE_FILE):
-        # state storage: {person_id: {rule_hash: ChecklistState}}
-        self.states: Dict[str, Dict[str, ChecklistState]] = {}
-        self._state_file = state_file
-        self._lock = threading.RLock()
-        self._load_from_disk()
-        
+
+    def __init__(self, db_file: str = _DB_FILE, legacy_state_file: str = _STATE_FILE):
+        # cached state, sharded LRUs: [{person_id: (loaded_at, {rule_hash: ChecklistState})}, ...]
+        self._shards: List[OrderedDict] = [
+            OrderedDict() for _ in range(SHARD_COUNT)
+        ]
+        self._locks = [threading.RLock() for _ in range(SHARD_COUNT)]
+        # min-heap of (expires_at_ts, person_id, rule_hash); may hold stale entries
+        self._expiry_heap: List[Tuple[float, str, str]] = []
+        self._db_file = db_file
+        self._legacy_state_file = legacy_state_file
+        self._global_lock = threading.RLock()
+        self._local = threading.local()
+        self._init_db()
+
     def _hash_rule(self, rule: PolicyRule) -> str:
-        """Generate a unique hash for a rule based on its description."""
-        return hashlib.md5(rule.description.encode()).hexdigest()[:8]
-    
-    def _load_from_disk(self):
-        """Load persisted state from JSON file on startup."""
-        if not os.path.exists(self._state_file):
-            logger.info("No saved compliance state found — starting fresh.")
-            return
-        try:
-            with open(self._state_file, "r") as f:
-                raw = json.load(f)
-            self.import_states(raw)
-            total_rules = sum(len(v) for v in self.states.values())
-            logger.info(
-                f"📂 Loaded compliance state: {len(self.states)} people, "
-                f"{total_rules} rule states from {self._state_file}"
+        """Generate a unique hash for a rule based on its description (cached)."""
+        return _rule_hash(rule.description)
+
+    def _shard_index(self, person_id: str) -> int:
+        return hash(person_id) % SHARD_COUNT
+
+    @contextmanager
+    def _all_locks(self):
+        """Hold every shard lock (index order) plus the global lock."""
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            stack.enter_context(self._global_lock)
+            yield
+
+    def _db(self) -> sqlite3.Connection:
+        """This thread's connection (reopened after a fork into a worker process)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self._db_file, check_same_thread=False, isolation_level=None, timeout=5.0
             )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        """Create the schema; a new database imports the legacy JSON snapshot."""
+        try:
+            conn = self._db()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            legacy = {}
+            if version == 0 and os.path.exists(self._legacy_state_file):
+                with open(self._legacy_state_file, "rb") as f:
+                    legacy = orjson.loads(f.read())
+            conn.executescript(_SCHEMA)
+            if version < SCHEMA_VERSION:
+                if legacy:
+                    self.import_states(legacy)
+                    logger.info(
+                        "📂 Imported %d people's compliance state from %s",
+                        len(legacy), self._legacy_state_file,
+                    )
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
             # Clean up expired entries on load
             self.clear_expired()
         except Exception as e:
-            logger.warning(f"Failed to load compliance state: {e}")
-    
-    def _save_to_disk(self):
-        """Persist current state to JSON file (called on every mutation)."""
+            logger.warning(f"Failed to initialize compliance state database: {e}")
+
+    def _persist(self, person_id: str, rule_hash: str, state: ChecklistState):
+        """Write one state through to SQLite (caller holds the person's shard lock)."""
         try:
-            data = self.get_all_states()
-            with open(self._state_file, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.warning(f"Failed to save compliance state: {e}")
-    
+            self._db().execute(_UPSERT_SQL, self._state_row(person_id, rule_hash, state))
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist compliance state: {e}")
+
+    @staticmethod
+    def _state_row(person_id: str, rule_hash: str, state: ChecklistState) -> tuple:
+        return (
+            person_id,
+            rule_hash,
+            state.status,
+            state.last_verified.timestamp() if state.last_verified else None,
+            state.expires_at_ts,
+        )
+
+    @staticmethod
+    def _build_state(
+        person_id: str, rule_hash: str, status: str,
+        last_verified_ts: Optional[float], expires_at_ts: Optional[float],
+    ) -> ChecklistState:
+        """Rebuild a state from stored epoch seconds (our own data — no validation)."""
+        return ChecklistState.model_construct(
+            rule_id=rule_hash,
+            person_id=person_id,
+            status=status or "pending",
+            last_verified=_from_ts(last_verified_ts) if last_verified_ts else None,
+            expires_at=_from_ts(expires_at_ts) if expires_at_ts else None,
+            expires_at_ts=expires_at_ts or None,
+        )
+
+    def _person_states(self, idx: int, person_id: str) -> Dict[str, ChecklistState]:
+        """Cached states for a person, loaded from SQLite if missing or stale.
+
+        Caller holds the person's shard lock.
+        """
+        shard = self._shards[idx]
+        now = time.monotonic()
+        cached = shard.get(person_id)
+        if cached is not None and now - cached[0] < PERSON_CACHE_TTL:
+            shard.move_to_end(person_id)
+            return cached[1]
+        previous = cached[1] if cached is not None else {}
+        person_states = {}
+        try:
+            rows = self._db().execute(
+                "SELECT rule_hash, status, last_verified_ts, expires_at_ts "
+                "FROM checklist_state WHERE person_id = ?",
+                (person_id,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load compliance state for {person_id}: {e}")
+            rows = []
+        expiries = []
+        for rule_hash, status, last_verified, expires_at in rows:
+            state = self._build_state(person_id, rule_hash, status, last_verified, expires_at)
+            person_states[rule_hash] = state
+            # A refresh only pushes expiries the heap doesn't already hold
+            old = previous.get(rule_hash)
+            if state.expires_at_ts and (old is None or old.expires_at_ts != state.expires_at_ts):
+                expiries.append((state.expires_at_ts, person_id, rule_hash))
+        shard[person_id] = (now, person_states)
+        shard.move_to_end(person_id)
+        if len(shard) > _SHARD_CACHE_SIZE:
+            shard.popitem(last=False)
+        if expiries:
+            with self._global_lock:
+                for entry in expiries:
+                    heapq.heappush(self._expiry_heap, entry)
+        return person_states
+
+    def _iter_rows(self) -> Iterable[tuple]:
+        return self._db().execute(
+            "SELECT person_id, rule_hash, status, last_verified_ts, expires_at_ts "
+            "FROM checklist_state"
+        )
+
+    @property
+    def states(self) -> Dict[str, Dict[str, ChecklistState]]:
+        """Read-only view of all persisted states: {person_id: {rule_hash: state}}."""
+        with self._all_locks():
+            merged: Dict[str, Dict[str, ChecklistState]] = {}
+            for person_id, rule_hash, status, last_verified, expires_at in self._iter_rows():
+                merged.setdefault(person_id, {})[rule_hash] = self._build_state(
+                    person_id, rule_hash, status, last_verified, expires_at
+                )
+            return merged
+
     def check_compliance(
-        self, 
-        person_id: str, 
+        self,
+        person_id: str,
         rule: PolicyRule,
         current_time: Optional[datetime] = None
     ) -> Tuple[bool, Optional[ChecklistState]]:
         """Check if a person is currently compliant with a checklist rule.
-        
+
         Returns:
             (is_compliant, state) - True if still valid, False if expired/pending
         """
         # Incident mode rules are never cached
         if rule.mode != "checklist":
             return False, None
-            
-        current_time = current_time or datetime.now(timezone.utc)
+
+        now_ts = current_time.timestamp() if current_time else time.time()
         rule_hash = self._hash_rule(rule)
-        
-        with self._lock:
+
+        idx = self._shard_index(person_id)
+        with self._locks[idx]:
             # Check if we have state for this person and rule
-            if person_id not in self.states:
+            state = self._person_states(idx, person_id).get(rule_hash)
+            if state is None:
                 return False, None
-                
-            if rule_hash not in self.states[person_id]:
-                return False, None
-                
-            state = self.states[person_id][rule_hash]
-            
+
             # Check if compliance has expired
-            if state.expires_at and current_time > state.expires_at:
+            if state.expires_at_ts and now_ts > state.expires_at_ts:
                 state.status = "expired"
-                logger.info(f"Checklist compliance expired for {person_id} on rule: {rule.description[:50]}")
-                self._save_to_disk()
+                logger.info("Checklist compliance expired for %s on rule: %.50s", person_id, rule.description)
+                self._persist(person_id, rule_hash, state)
                 return False, state
-                
+
             # Still compliant
             if state.status == "compliant":
-                logger.debug(f"Checklist still valid for {person_id} on rule: {rule.description[:50]}")
+                logger.debug("Checklist still valid for %s on rule: %.50s", person_id, rule.description)
                 return True, state
-                
+
         return False, state
-    
+
     def update_compliance(
         self,
         person_id: str,
@@ -123,41 +310,62 @@ class ComplianceStateTracker:
         current_time: Optional[datetime] = None
     ) -> ChecklistState:
         """Update compliance state for a checklist rule.
-        
+
         When someone becomes compliant, we remember it for the validity duration.
         """
         # Only track checklist mode
         if rule.mode != "checklist":
             return None
-            
+
         current_time = current_time or datetime.now(timezone.utc)
         rule_hash = self._hash_rule(rule)
-        
-        with self._lock:
-            # Initialize person's states if needed
-            if person_id not in self.states:
-                self.states[person_id] = {}
-                
+
+        idx = self._shard_index(person_id)
+        with self._locks[idx]:
+            person_states = self._person_states(idx, person_id)
+
+            # Calculate expiration
+            expires_at = None
+            if compliant and rule.validity_duration:
+                expires_at = current_time + timedelta(seconds=rule.validity_duration)
+
+            # Nothing changed (e.g. the same verdict reported again every frame):
+            # skip the write. A compliant refresh is a no-op only if it was
+            # verified within REFRESH_TOLERANCE and the expiry barely moves.
+            existing = person_states.get(rule_hash)
+            if existing is not None and existing.status == ("compliant" if compliant else "pending"):
+                if not compliant:
+                    return existing
+                now_ts = current_time.timestamp()
+                expires_ts = expires_at.timestamp() if expires_at else None
+                if (existing.last_verified is not None
+                        and now_ts - existing.last_verified.timestamp() < REFRESH_TOLERANCE
+                        and (existing.expires_at_ts is None) == (expires_ts is None)
+                        and (expires_ts is None
+                             or abs(expires_ts - existing.expires_at_ts) < REFRESH_TOLERANCE)):
+                    return existing
+
             # Create or update state
             if compliant:
-                # Calculate expiration
-                expires_at = None
-                if rule.validity_duration:
-                    expires_at = current_time + timedelta(seconds=rule.validity_duration)
-                    
                 state = ChecklistState(
                     rule_id=rule_hash,
                     person_id=person_id,
                     status="compliant",
                     last_verified=current_time,
-                    expires_at=expires_at
+                    expires_at=expires_at,
+                    expires_at_ts=expires_at.timestamp() if expires_at else None,
                 )
-                
-                self.states[person_id][rule_hash] = state
-                
+
+                person_states[rule_hash] = state
+                if expires_at:
+                    with self._global_lock:
+                        heapq.heappush(
+                            self._expiry_heap, (state.expires_at_ts, person_id, rule_hash)
+                        )
+
                 logger.info(
-                    f"✅ Checklist compliance updated for {person_id} on rule: {rule.description[:50]}"
-                    f" (valid until {expires_at.isoformat() if expires_at else 'forever'})"
+                    "✅ Checklist compliance updated for %s on rule: %.50s (valid until %s)",
+                    person_id, rule.description, expires_at or "forever",
                 )
             else:
                 # Mark as pending (needs to be shown again)
@@ -168,41 +376,48 @@ class ComplianceStateTracker:
                     last_verified=None,
                     expires_at=None
                 )
-                self.states[person_id][rule_hash] = state
-            
-            # Persist after every mutation
-            self._save_to_disk()
-                
+                person_states[rule_hash] = state
+
+            # Write-through: one row upsert
+            self._persist(person_id, rule_hash, state)
+
         return state
-    
+
     def get_checklist(
-        self, 
+        self,
         person_id: str,
         rules: List[PolicyRule],
         current_time: Optional[datetime] = None
     ) -> List[ChecklistItem]:
         """Get the current checklist status for a person.
-        
+
         Returns a list of checklist items with their current status.
         """
-        current_time = current_time or datetime.now(timezone.utc)
+        now_ts = current_time.timestamp() if current_time else time.time()
         checklist = []
-        
-        with self._lock:
+
+        idx = self._shard_index(person_id)
+        with self._locks[idx]:
+            person_states = self._person_states(idx, person_id)
             for rule in rules:
                 # Only include checklist-mode rules
                 if rule.mode != "checklist":
                     continue
-                    
-                # Check current state
-                is_compliant, state = self.check_compliance(person_id, rule, current_time)
-                
+
+                rule_hash = self._hash_rule(rule)
+                state = person_states.get(rule_hash)
+
+                # Mark expiry inline (same transition as check_compliance)
+                if (state and state.expires_at_ts and now_ts > state.expires_at_ts
+                        and state.status != "expired"):
+                    state.status = "expired"
+                    self._persist(person_id, rule_hash, state)
+
                 # Calculate time remaining
                 time_remaining = None
-                if state and state.expires_at and state.status == "compliant":
-                    delta = state.expires_at - current_time
-                    time_remaining = max(0, int(delta.total_seconds()))
-                    
+                if state and state.expires_at_ts and state.status == "compliant":
+                    time_remaining = max(0, int(state.expires_at_ts - now_ts))
+
                 item = ChecklistItem(
                     rule=rule,
                     status=state.status if state else "pending",
@@ -211,68 +426,113 @@ class ComplianceStateTracker:
                     time_remaining=time_remaining
                 )
                 checklist.append(item)
-            
+
         return checklist
-    
+
     def clear_expired(self, current_time: Optional[datetime] = None):
-        """Clean up expired states to save memory."""
-        current_time = current_time or datetime.now(timezone.utc)
-        
-        with self._lock:
+        """Clean up expired states to save memory and disk."""
+        now_ts = current_time.timestamp() if current_time else time.time()
+
+        # Pop due entries under the global lock, then re-check each one under
+        # its shard lock (shard locks are never taken while holding the global one)
+        with self._global_lock:
+            due = []
+            heap = self._expiry_heap
+            while heap and heap[0][0] < now_ts:
+                due.append(heapq.heappop(heap))
+
+        for expires_ts, person_id, rule_hash in due:
+            idx = self._shard_index(person_id)
+            with self._locks[idx]:
+                cached = self._shards[idx].get(person_id)
+                state = cached[1].get(rule_hash) if cached else None
+                # Skip stale entries (state replaced or re-verified since the push)
+                if state is None or state.expires_at_ts != expires_ts:
+                    continue
+                del cached[1][rule_hash]
+
+        # Rows for people never loaded into memory are removed here too
+        try:
+            removed = self._db().execute(
+                "DELETE FROM checklist_state WHERE expires_at_ts < ?", (now_ts,)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to delete expired compliance states: {e}")
             removed = 0
-            for person_id in list(self.states.keys()):
-                for rule_hash in list(self.states[person_id].keys()):
-                    state = self.states[person_id][rule_hash]
-                    if state.expires_at and current_time > state.expires_at:
-                        del self.states[person_id][rule_hash]
-                        removed += 1
-                # Remove empty person entries
-                if not self.states[person_id]:
-                    del self.states[person_id]
-            
-            if removed > 0:
-                logger.info(f"🧹 Cleaned {removed} expired compliance states")
-                self._save_to_disk()
-                    
+
+        if removed > 0:
+            logger.info("🧹 Cleaned %d expired compliance states", removed)
+
     def get_all_states(self) -> Dict:
-        """Get all current states for debugging/export."""
-        with self._lock:
-            return {
-                person_id: {
-                    rule_hash: {
-                        "status": state.status,
-                        "last_verified": state.last_verified.isoformat() if state.last_verified else None,
-                        "expires_at": state.expires_at.isoformat() if state.expires_at else None,
-                    }
-                    for rule_hash, state in person_states.items()
+        """Get all current states for debugging/export (timestamps as epoch seconds)."""
+        with self._all_locks():
+            export: Dict[str, Dict] = {}
+            for person_id, rule_hash, status, last_verified, expires_at in self._iter_rows():
+                export.setdefault(person_id, {})[rule_hash] = {
+                    "status": status,
+                    "last_verified": last_verified,
+                    "expires_at": expires_at,
                 }
-                for person_id, person_states in self.states.items()
-            }
-        
+            return export
+
     def import_states(self, states_dict: Dict):
-        """Import states from a dictionary (for session continuity / loading from disk)."""
-        with self._lock:
-            for person_id, person_states in states_dict.items():
-                if person_id not in self.states:
-                    self.states[person_id] = {}
+        """Import states from a dictionary (for session continuity / legacy snapshots).
+
+        The data comes from our own writer, so states are built with
+        model_construct (no validation). Timestamps may be epoch seconds
+        (get_all_states format) or ISO strings (legacy snapshots).
+        All rows are written in a single transaction.
+        """
+        rows = []
+        expiries = []
+        for person_id, person_states in states_dict.items():
+            idx = self._shard_index(person_id)
+            with self._locks[idx]:
+                target = self._person_states(idx, person_id)
                 for rule_hash, state_data in person_states.items():
-                    self.states[person_id][rule_hash] = ChecklistState(
-                        rule_id=rule_hash,
-                        person_id=person_id,
-                        status=state_data.get("status", "pending"),
-                        last_verified=datetime.fromisoformat(state_data["last_verified"]) 
-                            if state_data.get("last_verified") else None,
-                        expires_at=datetime.fromisoformat(state_data["expires_at"])
-                            if state_data.get("expires_at") else None,
+                    state = self._build_state(
+                        person_id,
+                        rule_hash,
+                        state_data.get("status", "pending"),
+                        _to_ts(state_data.get("last_verified")),
+                        _to_ts(state_data.get("expires_at")),
                     )
-    
+                    target[rule_hash] = state
+                    rows.append(self._state_row(person_id, rule_hash, state))
+                    if state.expires_at_ts:
+                        expiries.append((state.expires_at_ts, person_id, rule_hash))
+
+        if rows:
+            conn = self._db()
+            try:
+                conn.execute("BEGIN")
+                conn.executemany(_UPSERT_SQL, rows)
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                logger.warning(f"Failed to import compliance states: {e}")
+
+        # Single entries push; bulk loads re-heapify once
+        with self._global_lock:
+            if len(expiries) == 1:
+                heapq.heappush(self._expiry_heap, expiries[0])
+            elif expiries:
+                self._expiry_heap.extend(expiries)
+                heapq.heapify(self._expiry_heap)
+
     def reset(self):
         """Clear all compliance state (for testing or manual reset)."""
-        with self._lock:
-            self.states.clear()
-            self._save_to_disk()
+        with self._all_locks():
+            for shard in self._shards:
+                shard.clear()
+            self._expiry_heap.clear()
+            try:
+                self._db().execute("DELETE FROM checklist_state")
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to reset compliance state: {e}")
             logger.info("🔄 Compliance state reset")
 
 
 # Global instance for the application
-compliance_tracker = ComplianceStateTracker()
\ No newline at end of file
+compliance_tracker = ComplianceStateTracker()
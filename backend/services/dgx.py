@@ -10,15 +10,19 @@ Even for single frames, we wrap them as video_url to match the Cosmos input form
 
 import asyncio
 import base64
-import json
+import io
 import logging
 import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import cv2
 import numpy as np
+import orjson
 import requests as sync_requests
+from requests.adapters import HTTPAdapter
 
 from backend.core.config import DGX_PROXY_URL, DGX_MODEL_ID
 from backend.models.schemas import (
@@ -30,25 +34,56 @@ from backend.models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# JPEG decoding backends, fastest available first (both optional):
+#   nvJPEG (pynvjpeg) on hosts with a CUDA GPU, then libjpeg-turbo SIMD
+#   (PyTurboJPEG), then cv2.imdecode.
+try:
+    from nvjpeg import NvJpeg
+    _NVJ = NvJpeg()
+except (ImportError, RuntimeError, OSError):
+    _NVJ = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TJ = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _TJ = None
+
+# SIMD base64 codec (pybase64, optional) — same API as the stdlib module
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+# In-memory MP4 muxing via PyAV (optional); otherwise cv2.VideoWriter + temp file
+try:
+    import av
+except ImportError:
+    av = None
+
+# Clip codecs in order of preference: H.264 roughly halves the upload vs
+# MPEG-4 Part 2; fall back when the build has no H.264 encoder.
+MP4_CODECS = ("h264", "mpeg4")     # PyAV encoder names
+MP4_FOURCCS = ("avc1", "mp4v")     # cv2.VideoWriter fourccs
+
+# Frame decoding releases the GIL (libjpeg-turbo / nvJPEG / cv2), so a small
+# thread pool decodes a clip's frames in parallel.
+_DECODE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dgx-decode")
+
 # Use synchronous requests library (httpx.AsyncClient has Windows async socket issues).
 # Calls are run in a thread pool via asyncio.to_thread to avoid blocking the event loop.
+# One shared Session keeps connections to the proxy alive across calls
+# (requests' Session/urllib3 pool is thread-safe for concurrent posts).
+_SESSION = sync_requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
 
 
-def _build_dgx_prompt(policy: Policy) -> str:
-    """Build a compliance prompt from the user's policy rules for DGX."""
-    parts = [
-        "You are a security camera AI compliance monitor.",
-        "",
-        "COMPLIANCE RULES TO CHECK:",
-    ]
-
-    for i, rule in enumerate(policy.rules, 1):
-        parts.append(f"  {i}. [{rule.severity.upper()}] ({rule.type}) {rule.description}")
+_PROMPT_HEADER = "You are a security camera AI compliance monitor.\n\nCOMPLIANCE RULES TO CHECK:"
 
-    if policy.custom_prompt:
-        parts.append(f"\nADDITIONAL CONTEXT: {policy.custom_prompt}")
-
-    parts.append("""
+# Constant instructions + response schema appended after the rules
+_PROMPT_TAIL = """
 JOB: Analyze the image/video and evaluate compliance against ALL rules above.
 
 RESPOND IN THIS EXACT JSON FORMAT:
@@ -85,18 +120,74 @@ RULES:
 - Evaluate EVERY rule listed above
 - If no people are visible, return people_count: 0 and mark people-related rules as "no people visible"
 - Return ONLY the JSON, no other text
-""")
+"""
+
+
+def _build_dgx_prompt(policy: Policy) -> str:
+    """Build a compliance prompt from the user's policy rules for DGX."""
+    rules = tuple((r.severity, r.type, r.description) for r in policy.rules)
+    return _dgx_prompt_for(rules, policy.custom_prompt)
+
+
+@lru_cache(maxsize=128)
+def _dgx_prompt_for(rules: tuple, custom_prompt: str) -> str:
+    """Prompt text for a (rules, custom_prompt) pair — cached, as policies repeat per frame."""
+    rule_lines = "".join(
+        f"\n  {i}. [{severity.upper()}] ({rule_type}) {description}"
+        for i, (severity, rule_type, description) in enumerate(rules, 1)
+    )
+    context = f"\n\nADDITIONAL CONTEXT: {custom_prompt}" if custom_prompt else ""
+    return f"{_PROMPT_HEADER}{rule_lines}{context}\n{_PROMPT_TAIL}"
 
-    return "\n".join(parts)
 
+def _decode_jpeg(jpeg_bytes: bytes):
+    """Decode JPEG bytes to a BGR frame (nvJPEG/TurboJPEG if available); None if corrupt."""
+    if _NVJ is not None:
+        try:
+            return _NVJ.decode(jpeg_bytes)
+        except Exception:
+            return None
+    if _TJ is not None:
+        try:
+            return _TJ.decode(jpeg_bytes, pixel_format=TJPF_BGR)
+        except Exception:
+            return None
+    return cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
 
-def _frames_to_mp4_base64(frame_b64_list: list[str], fps: int = 4) -> str:
-    """Convert a list of base64-encoded JPEG frames into an mp4 video (base64).
+
+def _decode_b64_jpeg(b64: str):
+    """Decode one base64 JPEG frame (runs on _DECODE_POOL)."""
+    return _decode_jpeg(_b64.b64decode(b64))
+
+
+def _encode_mp4_in_memory(cv_frames: list, fps: int, w: int, h: int, codec: str) -> bytes:
+    """Mux BGR frames into an .mp4 entirely in memory with PyAV."""
+    buf = io.BytesIO()
+    with av.open(buf, mode="w", format="mp4") as container:
+        stream = container.add_stream(codec, rate=fps)
+        stream.width = w
+        stream.height = h
+        stream.pix_fmt = "yuv420p"
+        for f in cv_frames:
+            for packet in stream.encode(av.VideoFrame.from_ndarray(f, format="bgr24")):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return buf.getvalue()
+
+
+_MP4_DATA_URL_PREFIX = b"data:video/mp4;base64,"
+
+
+def _frames_to_mp4_data_url(frame_b64_list: list[str], fps: int = 4) -> str:
+    """Convert a list of base64-encoded JPEG frames into an mp4 video data URI.
 
     Replicates exactly what security.py does:
       1. Decode each JPEG → OpenCV frame
-      2. Write all frames to a temp mp4 file using cv2.VideoWriter
-      3. Read back the mp4 and base64-encode it
+      2. Encode all frames into an .mp4 (H.264, else mp4v) — in memory with
+         PyAV when installed, else via a temp file and cv2.VideoWriter
+      3. Base64-encode the mp4 bytes straight behind the data: prefix (bytes
+         concat, so the multi-MB blob is not re-copied into an f-string)
 
     This is the format the DGX Cosmos proxy expects.
     """
@@ -108,12 +199,13 @@ def _frames_to_mp4_base64(frame_b64_list: list[str], fps: int = 4) -> str:
 
     t0 = _time.perf_counter()
 
-    # Decode all JPEGs → numpy arrays
+    # Decode all JPEGs → numpy arrays in parallel. Repeated frames (e.g. the
+    # single-frame fallback sends one image 4x) are decoded once and written again.
+    unique = list(dict.fromkeys(frame_b64_list))
+    decoded = dict(zip(unique, _DECODE_POOL.map(_decode_b64_jpeg, unique)))
     cv_frames = []
     for i, b64 in enumerate(frame_b64_list):
-        jpeg_bytes = base64.b64decode(b64)
-        arr = np.frombuffer(jpeg_bytes, dtype=np.uint8)
-        frame = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+        frame = decoded[b64]
         if frame is not None:
             cv_frames.append(frame)
         else:
@@ -125,45 +217,61 @@ def _frames_to_mp4_base64(frame_b64_list: list[str], fps: int = 4) -> str:
     h, w = cv_frames[0].shape[:2]
     t_decode = _time.perf_counter()
 
-    # Create temp mp4 file — use mkstemp to avoid Windows file-locking issues
-    fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
-    _os.close(fd)  # close the fd so cv2 can write to it
-
-    try:
-        writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
-        for f in cv_frames:
-            writer.write(f)
-        writer.release()
+    mp4 = None
+    if av is not None:
+        for codec in MP4_CODECS:
+            try:
+                mp4 = _encode_mp4_in_memory(cv_frames, fps, w, h, codec)
+            except Exception as e:
+                logger.warning(f"In-memory mp4 encode ({codec}) failed: {e}")
+                continue
+            break
+
+    if mp4 is None:
+        # Create temp mp4 file — use mkstemp to avoid Windows file-locking issues
+        fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
+        _os.close(fd)  # close the fd so cv2 can write to it
 
-        with open(tmp_path, "rb") as f:
-            video_b64 = base64.b64encode(f.read()).decode()
-    finally:
         try:
-            _os.unlink(tmp_path)
-        except OSError:
-            pass
+            for fourcc in MP4_FOURCCS:
+                writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*fourcc), fps, (w, h))
+                if writer.isOpened():
+                    break
+                writer.release()
+            for f in cv_frames:
+                writer.write(f)
+            writer.release()
+
+            with open(tmp_path, "rb") as f:
+                mp4 = f.read()
+        finally:
+            try:
+                _os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    video_url = (_MP4_DATA_URL_PREFIX + _b64.b64encode(mp4)).decode("ascii")
 
     t_encode = _time.perf_counter()
     logger.info(
         f"🎞️  Created mp4 from {len(cv_frames)} frames ({w}x{h} @ {fps}fps) "
-        f"→ {len(video_b64)} chars base64  "
+        f"→ {len(video_url) - len(_MP4_DATA_URL_PREFIX)} chars base64  "
         f"[decode={t_decode - t0:.3f}s, encode={t_encode - t_decode:.3f}s]"
     )
-    return video_b64
+    return video_url
 
 
-def _build_dgx_request(frames_b64: list[str], policy: Policy) -> dict:
+def _build_dgx_request(frames_b64: list[str], prompt: str) -> dict:
     """Build the DGX proxy request payload from multiple JPEG frames.
 
     Converts the JPEG frames into an mp4 video clip (exactly like security.py),
     then wraps it as a data URI inside the OpenAI-compatible message format.
     Uses 'video_url' type with 'video/mp4' MIME to match what the DGX
-    Cosmos proxy expects.
+    Cosmos proxy expects. The prompt is built once by the caller
+    (_build_dgx_prompt) and reused for logging.
     """
-    prompt = _build_dgx_prompt(policy)
-
-    # Convert JPEG frames → mp4 video (exactly like security.py)
-    video_b64 = _frames_to_mp4_base64(frames_b64, fps=4)
+    # Convert JPEG frames → mp4 video data URI (exactly like security.py)
+    video_url = _frames_to_mp4_data_url(frames_b64, fps=4)
 
     return {
         "model": DGX_MODEL_ID,
@@ -173,9 +281,7 @@ def _build_dgx_request(frames_b64: list[str], policy: Policy) -> dict:
                 "content": [
                     {
                         "type": "video_url",
-                        "video_url": {
-                            "url": f"data:video/mp4;base64,{video_b64}"
-                        },
+                        "video_url": {"url": video_url},
                     },
                     {
                         "type": "text",
@@ -189,14 +295,17 @@ def _build_dgx_request(frames_b64: list[str], policy: Policy) -> dict:
     }
 
 
-def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
+def _parse_dgx_response(data: dict, policy: Policy, video_id: str, now_iso: str | None = None) -> Report:
     """Parse DGX proxy response into our standard Report format.
 
     The DGX proxy returns a compliance report from Nemotron with:
       - overall_status: "compliant" / "non_compliant"
       - violations: [{subject, rule, description}]
       - Possibly: summary, people, verdicts
+
+    now_iso is the request's analyzed_at timestamp (taken now if not given).
     """
+    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
     # Handle error responses
     if "error" in data:
         error_msg = data["error"]
@@ -206,7 +315,7 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
             video_id=video_id,
             summary=f"DGX Error: {error_msg}",
             overall_compliant=False,
-            analyzed_at=datetime.now(timezone.utc).isoformat(),
+            analyzed_at=now_iso,
             total_frames_analyzed=1,
             video_duration=0.0,
         )
@@ -227,14 +336,14 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
             lines = raw_content.split("\n")
             raw_content = "\n".join(lines[1:-1])
         try:
-            data = json.loads(raw_content)
-        except json.JSONDecodeError:
+            data = orjson.loads(raw_content)
+        except orjson.JSONDecodeError:
             logger.warning(f"DGX response not valid JSON, using raw text: {raw_content[:200]}")
             return Report(
                 video_id=video_id,
                 summary=raw_content[:500],
                 overall_compliant=False,
-                analyzed_at=datetime.now(timezone.utc).isoformat(),
+                analyzed_at=now_iso,
                 total_frames_analyzed=1,
                 video_duration=0.0,
             )
@@ -267,16 +376,16 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
                 incidents.append(verdict)
     else:
         # Build verdicts from policy rules + violations list
-        violation_rules = {v.get("rule", ""): v for v in violations_raw}
+        # (lowercase each violation's rule text once, not per rule pair)
+        viol_lc = [(vr, vr.get("rule", "").lower()) for vr in violations_raw]
 
         for rule in policy.rules:
-            matching_violation = None
-            for vr in violations_raw:
-                # fuzzy match: check if rule description appears in violation
-                if (rule.description.lower() in vr.get("rule", "").lower()
-                        or vr.get("rule", "").lower() in rule.description.lower()):
-                    matching_violation = vr
-                    break
+            # fuzzy match: check if rule description appears in violation
+            rule_lc = rule.description.lower()
+            matching_violation = next(
+                (vr for vr, vr_lc in viol_lc if rule_lc in vr_lc or vr_lc in rule_lc),
+                None,
+            )
 
             if matching_violation:
                 verdict = Verdict(
@@ -300,11 +409,9 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
             all_verdicts.append(verdict)
 
         # Add any violations that don't match a rule
-        for vr in violations_raw:
-            already_mapped = any(
-                not v.compliant and vr.get("rule", "").lower() in v.reason.lower()
-                for v in all_verdicts
-            )
+        incident_reasons_lc = [v.reason.lower() for v in all_verdicts if not v.compliant]
+        for vr, vr_lc in viol_lc:
+            already_mapped = any(vr_lc in reason for reason in incident_reasons_lc)
             if not already_mapped:
                 verdict = Verdict(
                     rule_type="dgx",
@@ -316,6 +423,7 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
                 )
                 all_verdicts.append(verdict)
                 incidents.append(verdict)
+                incident_reasons_lc.append(verdict.reason.lower())
 
     # Parse person summaries
     person_summaries = []
@@ -348,7 +456,7 @@ def _parse_dgx_response(data: dict, policy: Policy, video_id: str) -> Report:
         recommendations=recommendations,
         frame_observations=[],
         person_summaries=person_summaries,
-        analyzed_at=datetime.now(timezone.utc).isoformat(),
+        analyzed_at=now_iso,
         total_frames_analyzed=1,
         video_duration=0.0,
     )
@@ -377,6 +485,7 @@ async def analyze_frame_dgx(
     """
     if not video_id:
         video_id = f"dgx-frame-{uuid.uuid4().hex[:8]}"
+    now_iso = datetime.now(timezone.utc).isoformat()  # analyzed_at for every exit path
 
     # Use frames batch if provided, otherwise fall back to single frame repeated
     if frames and len(frames) > 0:
@@ -387,28 +496,32 @@ async def analyze_frame_dgx(
         frames_to_send = [image_base64] * 4
         logger.info(f"🟢 DGX: single frame fallback (repeated 4x)")
 
-    payload = _build_dgx_request(frames_to_send, policy)
+    prompt = _build_dgx_prompt(policy)
+    payload = _build_dgx_request(frames_to_send, prompt)
 
-    # ── Log outgoing request (without deep-copying the huge payload) ──
+    # ── Log outgoing request from a small view of the payload ─────────
+    # (references the existing dict — the multi-MB base64 clip is never copied)
     import time as _time
-    from datetime import datetime as _dt
-    video_url_len = 0
-    try:
-        video_url_len = len(payload["messages"][0]["content"][0]["video_url"]["url"])
-    except Exception:
-        pass
+    content = payload["messages"][0]["content"]
+    video_url = content[0]["video_url"]["url"]
     logger.info(
-        f"🚀 [{_dt.now().strftime('%H:%M:%S')}] SENDING REQUEST TO DGX SPARK\n"
-        f"    URL: {DGX_PROXY_URL}\n"
-        f"    Frames: {len(frames_to_send)}  |  Payload size: {video_url_len} chars base64"
+        "🚀 SENDING REQUEST TO DGX SPARK  URL: %s  |  Frames: %d  |  Payload size: %d chars base64",
+        DGX_PROXY_URL, len(frames_to_send), len(video_url),
     )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("➡️  DGX PAYLOAD: %s", {
+            "model": payload["model"],
+            "max_tokens": payload["max_tokens"],
+            "video_url_preview": f"{video_url[:60]}...[{len(video_url)} chars]",
+            "prompt_preview": prompt[:300],
+        })
 
     # ── Send request synchronously in a thread pool ───────────────────
     # (httpx.AsyncClient has Windows async socket issues; requests works reliably)
     t_send_start = _time.perf_counter()
 
     def _send_sync():
-        return sync_requests.post(
+        return _SESSION.post(
             DGX_PROXY_URL,
             json=payload,
             timeout=300,  # 5 min — Cosmos + Nemotron pipeline can take a while
@@ -422,21 +535,22 @@ async def analyze_frame_dgx(
 
         # ── Log raw HTTP response ─────────────────────────────────────
         logger.info(
-            f"📥 [{_dt.now().strftime('%H:%M:%S')}] DGX SPARK RESPONDED\n"
-            f"    Status: {response.status_code}  |  ⏱️ Round-trip: {elapsed:.1f}s\n"
-            f"    Body: {response.text[:500]}"
+            "📥 DGX SPARK RESPONDED  Status: %d  |  ⏱️ Round-trip: %.1fs",
+            response.status_code, elapsed,
         )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("    Body: %s", response.content[:500].decode("utf-8", "replace"))
 
         # Parse JSON BEFORE raise_for_status — the DGX proxy returns JSON
         # error bodies on 502/5xx (e.g. {"error": "Cosmos unreachable"}).
         # The working security.py script does NOT call raise_for_status;
         # it parses the JSON and checks for "error" key. We replicate that.
         try:
-            data = response.json()
+            data = orjson.loads(response.content)
         except Exception:
             # If the body isn't JSON, THEN raise for HTTP status
             response.raise_for_status()
-            raise ValueError(f"DGX returned non-JSON response: {response.text[:200]}")
+            raise ValueError(f"DGX returned non-JSON response: {response.content[:200].decode('utf-8', 'replace')}")
 
         # Check for error in JSON body (matches security.py behavior)
         if "error" in data:
@@ -450,7 +564,7 @@ async def analyze_frame_dgx(
                     video_id=video_id,
                     summary=f"DGX Cosmos model is unreachable. The Cosmos vision model on the DGX is not running. Error: {error_msg}",
                     overall_compliant=False,
-                    analyzed_at=datetime.now(timezone.utc).isoformat(),
+                    analyzed_at=now_iso,
                     total_frames_analyzed=1,
                     video_duration=0.0,
                 )
@@ -460,7 +574,7 @@ async def analyze_frame_dgx(
                     video_id=video_id,
                     summary=f"DGX error: {error_msg}",
                     overall_compliant=False,
-                    analyzed_at=datetime.now(timezone.utc).isoformat(),
+                    analyzed_at=now_iso,
                     total_frames_analyzed=1,
                     video_duration=0.0,
                 )
@@ -471,7 +585,7 @@ async def analyze_frame_dgx(
             video_id=video_id,
             summary="DGX request timed out (300s limit). The Cosmos+Nemotron pipeline may be overloaded.",
             overall_compliant=False,
-            analyzed_at=datetime.now(timezone.utc).isoformat(),
+            analyzed_at=now_iso,
             total_frames_analyzed=1,
             video_duration=0.0,
         )
@@ -481,7 +595,7 @@ async def analyze_frame_dgx(
             video_id=video_id,
             summary=f"Cannot connect to DGX Spark at {DGX_PROXY_URL}. Is the proxy (vlm_listener.py) running on the DGX?",
             overall_compliant=False,
-            analyzed_at=datetime.now(timezone.utc).isoformat(),
+            analyzed_at=now_iso,
             total_frames_analyzed=1,
             video_duration=0.0,
         )
@@ -491,7 +605,7 @@ async def analyze_frame_dgx(
             video_id=video_id,
             summary=f"DGX HTTP error {e.response.status_code}: {e.response.text[:200]}",
             overall_compliant=False,
-            analyzed_at=datetime.now(timezone.utc).isoformat(),
+            analyzed_at=now_iso,
             total_frames_analyzed=1,
             video_duration=0.0,
         )
@@ -501,14 +615,18 @@ async def analyze_frame_dgx(
             video_id=video_id,
             summary=f"DGX error: {str(e)}",
             overall_compliant=False,
-            analyzed_at=datetime.now(timezone.utc).isoformat(),
+            analyzed_at=now_iso,
             total_frames_analyzed=1,
             video_duration=0.0,
         )
 
     # ── Log parsed response ───────────────────────────────────────────
-    logger.info(f"⬅️  DGX PARSED JSON: {json.dumps(data, indent=2)[:3000]}")
-    report = _parse_dgx_response(data, policy, video_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "⬅️  DGX PARSED JSON: %s",
+            orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()[:3000],
+        )
+    report = _parse_dgx_response(data, policy, video_id, now_iso)
     logger.info(
         f"🟢 DGX analysis: {'COMPLIANT' if report.overall_compliant else 'NON-COMPLIANT'}"
         f" | {len(report.person_summaries)} people | {len(report.incidents)} incidents"
@@ -714,35 +832,46 @@ async def analyze_frames_dgx_parallel(
 # Background DGX health probe — never blocks /health endpoint
 # ---------------------------------------------------------------------------
 _dgx_health_cache: dict = {"status": "checking"}
-_health_probe_started = False
+_health_probe_task: asyncio.Task | None = None
+DGX_HEALTH_PROBE_INTERVAL = 30  # seconds between re-probes
 
 
 def get_dgx_cached_status() -> dict:
-    """Return cached DGX status (never blocks). Starts probe on first call."""
-    global _health_probe_started
-    if not _health_probe_started:
-        _health_probe_started = True
-        import threading
-        threading.Thread(target=_probe_dgx_sync, daemon=True).start()
+    """Return cached DGX status (never blocks). Starts the probe if not yet running."""
+    start_dgx_health_probe()
     return _dgx_health_cache
 
 
-def _probe_dgx_sync():
-    """Run in a background thread — pings DGX with a socket connect."""
-    import socket
+def start_dgx_health_probe() -> None:
+    """Start the periodic DGX probe on the running event loop (idempotent)."""
+    global _health_probe_task
+    if _health_probe_task is None or _health_probe_task.done():
+        _health_probe_task = asyncio.get_running_loop().create_task(_probe_dgx_loop())
+
+
+async def _probe_dgx_loop():
+    """Re-probe the DGX with a non-blocking TCP connect every DGX_HEALTH_PROBE_INTERVAL s."""
     from backend.core.config import DGX_SPARK_IP, DGX_PROXY_PORT
 
     global _dgx_health_cache
     base_url = f"http://{DGX_SPARK_IP}:{DGX_PROXY_PORT}"
 
-    try:
-        sock = socket.create_connection((DGX_SPARK_IP, int(DGX_PROXY_PORT)), timeout=3)
-        sock.close()
-        _dgx_health_cache = {"status": "connected", "url": base_url}
-        logger.info(f"🟢 DGX health probe: connected to {base_url}")
-    except (socket.timeout, ConnectionRefusedError, OSError) as e:
-        _dgx_health_cache = {"status": "unreachable", "url": base_url, "error": str(e)}
-        logger.warning(f"🔴 DGX health probe: unreachable ({e})")
+    while True:
+        previous = _dgx_health_cache.get("status")
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(DGX_SPARK_IP, int(DGX_PROXY_PORT)), timeout=3
+            )
+            writer.close()
+            await writer.wait_closed()
+            _dgx_health_cache = {"status": "connected", "url": base_url}
+            if previous != "connected":
+                logger.info(f"🟢 DGX health probe: connected to {base_url}")
+        except (asyncio.TimeoutError, OSError) as e:
+            _dgx_health_cache = {"status": "unreachable", "url": base_url, "error": str(e)}
+            if previous != "unreachable":
+                logger.warning(f"🔴 DGX health probe: unreachable ({e})")
+        await asyncio.sleep(DGX_HEALTH_PROBE_INTERVAL)
 
 
 async def check_dgx_health() -> dict:
@@ -753,7 +882,7 @@ async def check_dgx_health() -> dict:
 
     def _check():
         try:
-            r = sync_requests.get(f"{base_url}/health", timeout=3)
+            r = _SESSION.get(f"{base_url}/health", timeout=3)
             if r.status_code in [200, 404]:
                 return {"status": "connected", "url": base_url}
         except Exception:
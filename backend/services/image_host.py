@@ -0,0 +1,105 @@
+"""Image host — serves keyframes to OpenAI by URL instead of inline base64.
+
+Inlining a keyframe as a data: URL makes every request carry the full base64
+payload (a third larger than the JPEG itself) through the HTTP client. When
+IMAGE_HOST_BASE_URL is configured, keyframes are written to IMAGE_HOST_DIR and
+the model gets a short-lived HMAC-signed URL served by routers/images.py.
+Without it, image_url() falls back to the data: URL so local setups (where
+OpenAI cannot reach the API) keep working unchanged.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+import uuid
+
+from backend.core.config import (
+    IMAGE_HOST_BASE_URL, IMAGE_HOST_DIR, IMAGE_HOST_SECRET, IMAGE_HOST_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# A per-process secret only verifies URLs published by the same process;
+# set IMAGE_HOST_SECRET when Celery workers publish and the API serves.
+_SECRET = (IMAGE_HOST_SECRET or secrets.token_hex(32)).encode()
+if IMAGE_HOST_BASE_URL and not IMAGE_HOST_SECRET:
+    logger.warning("IMAGE_HOST_SECRET not set — hosted image URLs only verify within this process")
+
+# Expired files are swept at most this often (seconds)
+SWEEP_INTERVAL = 60.0
+_last_sweep = 0.0
+
+
+def enabled() -> bool:
+    return bool(IMAGE_HOST_BASE_URL)
+
+
+def _signature(name: str, expires: int) -> str:
+    return hmac.new(_SECRET, f"{name}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify(name: str, expires: int, sig: str) -> bool:
+    """True if (name, expires, sig) came from publish() and has not expired."""
+    return expires >= time.time() and hmac.compare_digest(sig, _signature(name, expires))
+
+
+def path_for(name: str) -> str:
+    # publish() names are bare "<hex>.jpg"; anything else never verifies, but
+    # basename() keeps a forged name from escaping the directory regardless
+    return os.path.join(IMAGE_HOST_DIR, os.path.basename(name))
+
+
+def _sweep_expired(now: float) -> None:
+    """Delete hosted images older than the URL TTL."""
+    try:
+        entries = list(os.scandir(IMAGE_HOST_DIR))
+    except FileNotFoundError:
+        return
+    cutoff = now - IMAGE_HOST_TTL
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _write(name: str, image_bytes: bytes) -> None:
+    global _last_sweep
+    os.makedirs(IMAGE_HOST_DIR, exist_ok=True)
+    with open(path_for(name), "wb") as f:
+        f.write(image_bytes)
+    now = time.time()
+    if now - _last_sweep >= SWEEP_INTERVAL:
+        _last_sweep = now
+        _sweep_expired(now)
+
+
+async def publish(image_bytes: bytes, ttl: int = IMAGE_HOST_TTL) -> str:
+    """Store a JPEG and return a signed URL for it, valid for ttl seconds."""
+    name = f"{uuid.uuid4().hex}.jpg"
+    await asyncio.to_thread(_write, name, image_bytes)
+    expires = int(time.time()) + ttl
+    return f"{IMAGE_HOST_BASE_URL}/images/{name}?expires={expires}&sig={_signature(name, expires)}"
+
+
+async def image_url(image_base64: str, inline: bool = False) -> str:
+    """URL to hand OpenAI for a base64 JPEG keyframe.
+
+    inline=True forces the data: URL — for Batch API requests, which may run
+    long after a short-lived URL has expired.
+    """
+    if inline or not enabled():
+        return f"data:image/jpeg;base64,{image_base64}"
+    return await publish(base64.b64decode(image_base64))
+
+
+async def image_urls(images_base64: list[str], inline: bool = False) -> list[str]:
+    if inline or not enabled():
+        return [f"data:image/jpeg;base64,{b64}" for b64 in images_base64]
+    return list(await asyncio.gather(*(image_url(b64) for b64 in images_base64)))
@@ -8,15 +8,17 @@ This runs SEPARATELY from the visual policy evaluator, in parallel.
 Results are merged into the final report by the router.
 """
 
-import json
 import logging
 
+import orjson
+
 from backend.core.config import openai_client as client
 from backend.models.schemas import (
     PolicyRule,
     TranscriptResult,
     Verdict,
 )
+from backend.services.api_utils import llm_slot
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +72,11 @@ SPEECH_VERDICTS_SCHEMA = {
     "additionalProperties": False,
 }
 
+SPEECH_VERDICTS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "speech_verdicts", "strict": True, "schema": SPEECH_VERDICTS_SCHEMA},
+}
+
 
 def _format_transcript(transcript: TranscriptResult) -> str:
     """Format transcript for the LLM."""
@@ -152,29 +159,23 @@ async def evaluate_speech(
 
 Evaluate each speech rule against the FULL ACCUMULATED transcript (all chunks combined). Be precise — count exact phrase occurrences across the entire session, quote relevant segments."""
 
-    response = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": SPEECH_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={
-            "type": "json_schema",
-            "json_schema": {
-                "name": "speech_verdicts",
-                "strict": True,
-                "schema": SPEECH_VERDICTS_SCHEMA,
-            },
-        },
-        temperature=0.1,
-        max_tokens=1500,
-    )
+    async with llm_slot():
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SPEECH_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format=SPEECH_VERDICTS_RESPONSE_FORMAT,
+            temperature=0.1,
+            max_tokens=1500,
+        )
 
     raw = response.choices[0].message.content or "{}"
 
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
         logger.error(f"Failed to parse speech evaluation JSON from LLM: {raw[:200]}")
         return [
             Verdict(
@@ -12,6 +12,8 @@ import sys
 import logging
 import cv2
 import base64
+import numpy as np
+import xxhash
 
 # Add project root to path so we can import scene_detection
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -26,10 +28,28 @@ from backend.models.schemas import KeyframeData, VideoProcessingResult
 logger = logging.getLogger(__name__)
 
 MAX_KEYFRAME_WIDTH = 768      # For file uploads — higher detail
+KEYFRAME_JPEG_QUALITY = 70    # File-upload keyframes; OpenAI downsamples them anyway
 MAX_WEBCAM_WIDTH = 512        # For webcam chunks — speed over detail
 WEBCAM_JPEG_QUALITY = 60      # Lower quality for webcam = smaller base64 = faster upload
 MAX_WEBCAM_FRAMES = 2         # 2 frames is enough for short webcam chunks
 
+VIDEO_HEADER_SIZE = 12        # Bytes needed by looks_like_video()
+HASH_CHUNK_SIZE = 1 << 20     # Read size when hashing video content
+
+
+def looks_like_video(head: bytes) -> bool:
+    """Check the first 12 bytes of a file against known video container magic.
+
+    Recognizes ISO BMFF (MP4/MOV: "ftyp" box), Matroska/WebM (EBML header)
+    and AVI (RIFF....AVI ). Cheaper and more reliable than trusting the
+    client-supplied Content-Type.
+    """
+    return (
+        head[4:8] == b"ftyp"
+        or head[:4] == b"\x1aE\xdf\xa3"
+        or (head[:4] == b"RIFF" and head[8:12] == b"AVI ")
+    )
+
 
 def resize_and_encode(image_path: str, max_width: int = MAX_KEYFRAME_WIDTH) -> str:
     """Read a keyframe image, resize to max_width, return base64 JPEG string."""
@@ -39,7 +59,29 @@ def resize_and_encode(image_path: str, max_width: int = MAX_KEYFRAME_WIDTH) -> s
     return _encode_frame(img, max_width)
 
 
-def _encode_frame(img, max_width: int = MAX_KEYFRAME_WIDTH, jpeg_quality: int = 85) -> str:
+def shrink_image_base64(
+    image_base64: str,
+    max_width: int = MAX_WEBCAM_WIDTH,
+    jpeg_quality: int = WEBCAM_JPEG_QUALITY,
+) -> str:
+    """Re-encode a client-supplied base64 image at max_width / jpeg_quality.
+
+    Frames posted by clients arrive at whatever size and quality they chose;
+    this brings them in line with the frames sampled here. Returns the input
+    unchanged if it can't be decoded or the re-encode isn't smaller.
+    """
+    try:
+        buf = np.frombuffer(base64.b64decode(image_base64), np.uint8)
+    except ValueError:  # binascii.Error: not valid base64
+        return image_base64
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR) if buf.size else None
+    if img is None:
+        return image_base64
+    shrunk = _encode_frame(img, max_width, jpeg_quality)
+    return shrunk if len(shrunk) < len(image_base64) else image_base64
+
+
+def _encode_frame(img, max_width: int = MAX_KEYFRAME_WIDTH, jpeg_quality: int = KEYFRAME_JPEG_QUALITY) -> str:
     """Resize a cv2 frame and return base64 JPEG string."""
     h, w = img.shape[:2]
     if w > max_width:
@@ -49,6 +91,23 @@ def _encode_frame(img, max_width: int = MAX_KEYFRAME_WIDTH, jpeg_quality: int =
     return base64.b64encode(buffer).decode("utf-8")
 
 
+def frame_dhash(image_base64: str) -> str:
+    """64-bit perceptual difference hash (hex) of a base64 JPEG; "" if undecodable.
+
+    Stable under re-encoding and small brightness changes, so near-identical
+    frames from a fixed camera hash the same.
+    """
+    try:
+        buf = np.frombuffer(base64.b64decode(image_base64), np.uint8)
+    except ValueError:  # binascii.Error: not valid base64
+        return ""
+    img = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE) if buf.size else None
+    if img is None:
+        return ""
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, :-1] > small[:, 1:]).tobytes().hex()
+
+
 def _quick_sample(file_path: str, keyframes_dir: str, max_frames: int = MAX_WEBCAM_FRAMES) -> list[KeyframeData]:
     """Fast interval sampling for short webcam chunks. No change detection.
 
@@ -199,3 +258,48 @@ def process_video(
         metadata=metadata,
         keyframes=keyframes,
     )
+
+
+def _content_key(file_path: str) -> str:
+    """xxh3-128 of the video bytes plus size — identifies re-uploads of the same file."""
+    h = xxhash.xxh3_128()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return f"{h.hexdigest()}-{os.path.getsize(file_path)}"
+
+
+def process_video_cached(file_path: str, keyframes_dir: str = "keyframes") -> VideoProcessingResult:
+    """process_video() memoized on disk by content hash.
+
+    Repeat uploads of the same video (QA re-runs, retries) reuse the
+    extracted keyframes from keyframes_dir/<hash>/manifest.json instead of
+    decoding the video again. Entries age out with the keyframes cleanup.
+    """
+    try:
+        key = _content_key(file_path)
+    except OSError as e:
+        logger.warning(f"Could not hash {file_path} for keyframe cache: {e}")
+        return process_video(file_path=file_path, keyframes_dir=keyframes_dir)
+
+    manifest_path = os.path.join(keyframes_dir, key, "manifest.json")
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "rb") as f:
+                result = VideoProcessingResult.model_validate_json(f.read())
+            logger.info(f"Keyframe cache hit for {file_path} ({len(result.keyframes)} frames)")
+            return result
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable keyframe manifest {manifest_path}: {e}")
+
+    result = process_video(file_path=file_path, keyframes_dir=keyframes_dir)
+    if result.keyframes:
+        try:
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            tmp_path = manifest_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(result.model_dump_json())
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            logger.warning(f"Failed to write keyframe manifest: {e}")
+    return result
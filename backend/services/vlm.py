@@ -8,26 +8,41 @@ The policy context is included in the prompt so the VLM knows what to focus on.
 """
 
 import asyncio
-import json
 import logging
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+import orjson
+import xxhash
 
 from backend.core.config import openai_client as client
 from backend.models.schemas import KeyframeData, FrameObservation, PersonDetail, Policy, ReferenceImage
-from backend.services.api_utils import exponential_backoff_retry, track_usage, check_rate_limit, estimate_cost
+from backend.services.api_utils import (
+    exponential_backoff_retry, track_usage, check_rate_limit, estimate_cost,
+    cache_get_many, cache_set_many, llm_slot,
+)
+from backend.services.image_host import image_urls
+from backend.services.video import frame_dhash
 
 logger = logging.getLogger(__name__)
 
 
 def _effective_reference_images(policy: Policy) -> list[ReferenceImage]:
     """Only references whose id is in enabled_reference_ids are sent to the VLM."""
-    enabled = getattr(policy, "enabled_reference_ids", None) or []
+    enabled = policy.enabled_reference_ids
     if not enabled:
         return []
-    return [r for r in policy.reference_images if getattr(r, "id", None) and r.id in enabled]
+    return [r for r in policy.reference_images if r.id and r.id in enabled]
 
 # Max keyframes per single API call (GPT-4o supports multi-image)
 BATCH_SIZE = 5
 
+# Max batches in flight; the keyframe source is only pulled as slots free up
+MAX_CONCURRENT_BATCHES = 8
+
+# Per-frame observations are cached in Redis by (policy context, frame dHash),
+# for the shortest validity_duration among the rules, or this many seconds
+OBSERVATION_CACHE_TTL = 3600
+
 SYSTEM_PROMPT = """You are a visual surveillance analyst for a compliance monitoring system.
 
 For each image provided, describe what you see concisely and factually. Focus on:
@@ -124,8 +139,9 @@ def _build_batch_messages(
     batch: list[KeyframeData],
     policy_context: str,
     policy: Policy,
+    frame_urls: list[str],
 ) -> list[dict]:
-    """Build the OpenAI chat messages for a batch of keyframes."""
+    """Build the OpenAI chat messages for a batch of keyframes (one URL per frame)."""
     content = []
 
     # Text intro with timestamps
@@ -144,12 +160,10 @@ def _build_batch_messages(
     # Add reference images FIRST (before surveillance frames) so the VLM sees them as context
     for i, ref in enumerate(policy.reference_images):
         content.append({"type": "text", "text": f"[REFERENCE {i + 1}: {ref.label}]"})
-        # Detect format from base64 header or default to jpeg
-        mime = "image/png" if ref.image_base64[:4] == "iVBO" else "image/jpeg"
         content.append({
             "type": "image_url",
             "image_url": {
-                "url": f"data:{mime};base64,{ref.image_base64}",
+                "url": ref.data_url,
                 "detail": "low",
             },
         })
@@ -159,11 +173,11 @@ def _build_batch_messages(
         content.append({"type": "text", "text": "[SURVEILLANCE FRAMES BELOW]"})
 
     # Add each surveillance keyframe — detail:auto for action recognition
-    for kf in batch:
+    for url in frame_urls:
         content.append({
             "type": "image_url",
             "image_url": {
-                "url": f"data:image/jpeg;base64,{kf.image_base64}",
+                "url": url,
                 "detail": "auto",
             },
         })
@@ -180,7 +194,8 @@ async def _analyze_batch(
     policy: Policy,
 ) -> list[FrameObservation]:
     """Send a batch of keyframes to GPT-4o and parse observations."""
-    messages = _build_batch_messages(batch, policy_context, policy)
+    frame_urls = await image_urls([kf.image_base64 for kf in batch])
+    messages = _build_batch_messages(batch, policy_context, policy, frame_urls)
 
     # Check rate limit before making call
     if not check_rate_limit("vlm", max_per_minute=30, max_per_hour=500):
@@ -189,12 +204,13 @@ async def _analyze_batch(
 
     # Wrap API call in retry logic
     async def make_api_call():
-        return await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=1000,
-            temperature=0.1,  # Low temp for factual descriptions
-        )
+        async with llm_slot():
+            return await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.1,  # Low temp for factual descriptions
+            )
 
     response = await exponential_backoff_retry(
         make_api_call,
@@ -228,8 +244,8 @@ async def _analyze_batch(
         raw_text = "\n".join(lines[1:-1])
 
     try:
-        parsed = json.loads(raw_text)
-    except json.JSONDecodeError:
+        parsed = orjson.loads(raw_text)
+    except orjson.JSONDecodeError:
         # Fallback: treat entire response as a single observation for all frames
         parsed = [
             {"timestamp": kf.timestamp, "description": raw_text}
@@ -268,41 +284,149 @@ async def _analyze_batch(
     return observations
 
 
+async def _batched(
+    keyframes: Iterable[KeyframeData] | AsyncIterable[KeyframeData],
+    size: int,
+) -> AsyncIterator[list[KeyframeData]]:
+    """Group a sync or async keyframe source into lists of up to `size`."""
+    batch: list[KeyframeData] = []
+    if isinstance(keyframes, AsyncIterable):
+        async for kf in keyframes:
+            batch.append(kf)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    else:
+        for kf in keyframes:
+            batch.append(kf)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _observation_key(cache_ns: str, frame_hash: str) -> str:
+    return f"vlm:{cache_ns}:{frame_hash}"
+
+
+async def _uncached(
+    batches: AsyncIterator[list[KeyframeData]],
+    cache_ns: str,
+    frame_hashes: dict[int, str],
+    hits: list[FrameObservation],
+) -> AsyncIterator[KeyframeData]:
+    """Yield only keyframes without a cached observation (one MGET per batch).
+
+    Cached observations are rebuilt onto the new keyframe and collected in
+    `hits`; the dHash of every miss is recorded in `frame_hashes` (by id).
+    """
+    async for batch in batches:
+        hashes = [frame_dhash(kf.image_base64) if kf.image_base64 else "" for kf in batch]
+        keys = [_observation_key(cache_ns, h) for h in hashes if h]
+        cached = iter(cache_get_many(keys))
+        for kf, h in zip(batch, hashes):
+            raw = next(cached) if h else None
+            if raw is None:
+                if h:
+                    frame_hashes[id(kf)] = h
+                yield kf
+                continue
+            data = orjson.loads(raw)
+            hits.append(FrameObservation(
+                timestamp=kf.timestamp,
+                description=data["description"],
+                trigger=kf.trigger,
+                change_score=kf.change_score,
+                image_base64=kf.image_base64,
+                people=[PersonDetail(**p) for p in data["people"]],
+            ))
+
+
+def _observation_ttl(policy: Policy) -> int:
+    """Cache lifetime for observations: the shortest rule validity, if any."""
+    durations = [r.validity_duration for r in policy.rules if (r.validity_duration or 0) > 0]
+    return min(durations) if durations else OBSERVATION_CACHE_TTL
+
+
+def _store_observations(
+    cache_ns: str,
+    batch: list[KeyframeData],
+    observations: list[FrameObservation],
+    frame_hashes: dict[int, str],
+    ttl: int = OBSERVATION_CACHE_TTL,
+) -> None:
+    """Cache successful per-frame observations of one batch."""
+    items = {}
+    for kf, obs in zip(batch, observations):
+        h = frame_hashes.get(id(kf))
+        if h and obs.description != "No observation returned for this frame.":
+            items[_observation_key(cache_ns, h)] = orjson.dumps({
+                "description": obs.description,
+                "people": [p.model_dump() for p in obs.people],
+            }).decode()
+    cache_set_many(items, ttl)
+
+
 async def analyze_frames(
-    keyframes: list[KeyframeData],
+    keyframes: Iterable[KeyframeData] | AsyncIterable[KeyframeData],
     policy: Policy,
 ) -> list[FrameObservation]:
     """Analyze all keyframes using GPT-4o vision.
 
-    Keyframes are batched (up to BATCH_SIZE per call) and sent concurrently.
+    Keyframes are batched (up to BATCH_SIZE per call) and sent concurrently,
+    at most MAX_CONCURRENT_BATCHES at a time. The source may be a list or an
+    async iterator; it is consumed lazily, so a streaming producer overlaps
+    with inference and only the in-flight frames need to be held.
     Only references in policy.enabled_reference_ids are sent to the VLM.
 
     Args:
-        keyframes: List of keyframes with base64 images from change detection.
+        keyframes: Keyframes with base64 images from change detection.
         policy: The compliance policy — used to focus VLM attention.
 
     Returns:
         List of FrameObservation with text descriptions per keyframe.
     """
-    if not keyframes:
-        return []
-
     effective = _effective_policy(policy)
     policy_context = _build_policy_context(effective)
 
     # Reduce batch size when reference images are present (each ref = 1 extra image in the call)
     effective_batch = max(1, BATCH_SIZE - len(effective.reference_images))
 
-    # Split into batches
-    batches = [
-        keyframes[i : i + effective_batch]
-        for i in range(0, len(keyframes), effective_batch)
-    ]
-
-    logger.info(f"VLM analysis: {len(keyframes)} keyframes in {len(batches)} batch(es) (batch_size={effective_batch}, refs={len(effective.reference_images)})")
+    # Observations depend on the prompt (policy focus + reference people) too
+    cache_ns = xxhash.xxh3_64_hexdigest(
+        (policy_context + "|" + ",".join(r.id or r.label for r in effective.reference_images)).encode()
+    )
+    cache_ttl = _observation_ttl(effective)
+    frame_hashes: dict[int, str] = {}
+    hits: list[FrameObservation] = []
+
+    slots = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+    async def _run(batch: list[KeyframeData]) -> list[FrameObservation]:
+        try:
+            observations = await _analyze_batch(batch, policy_context, effective)
+            _store_observations(cache_ns, batch, observations, frame_hashes, cache_ttl)
+            return observations
+        finally:
+            slots.release()
+
+    # Dispatch batches of cache misses as they fill; block the source while all slots are busy
+    batches: list[list[KeyframeData]] = []
+    tasks = []
+    misses = _uncached(_batched(keyframes, effective_batch), cache_ns, frame_hashes, hits)
+    async for batch in _batched(misses, effective_batch):
+        await slots.acquire()
+        batches.append(batch)
+        tasks.append(asyncio.create_task(_run(batch)))
+
+    if not tasks:
+        if hits:
+            logger.info(f"VLM analysis: all {len(hits)} keyframes served from observation cache")
+        return hits
+
+    logger.info(f"VLM analysis: {sum(len(b) for b in batches)} keyframes in {len(batches)} batch(es), {len(hits)} cached (batch_size={effective_batch}, refs={len(effective.reference_images)})")
 
-    # Run batches concurrently
-    tasks = [_analyze_batch(batch, policy_context, effective) for batch in batches]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Flatten results, handle any failed batches gracefully
@@ -322,5 +446,9 @@ async def analyze_frames(
         else:
             all_observations.extend(result)
 
+    if hits:
+        all_observations.extend(hits)
+        all_observations.sort(key=lambda o: o.timestamp)
+
     logger.info(f"VLM analysis complete: {len(all_observations)} observations")
     return all_observations
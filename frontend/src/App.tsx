@@ -172,6 +172,31 @@ export default function App() {
     return new File([blob], `chunk-${Date.now()}.webm`, { type: "video/webm" });
   }, []);
 
+  /**
+   * Descriptions of AT_LEAST_ONCE / AT_LEAST_N rules satisfied in any prior report.
+   * Sent as policy.satisfied_rules so the backend can skip them entirely.
+   */
+  const buildSatisfiedRules = useCallback((reports: Report[]): string[] => {
+    // Build a lookup: rule description → frequency
+    const ruleFrequency = new Map<string, string>();
+    for (const rule of policyRef.current.rules) {
+      ruleFrequency.set(rule.description, rule.frequency || "always");
+    }
+
+    const satisfied = new Set<string>();
+    for (const r of reports) {
+      for (const v of r.all_verdicts ?? []) {
+        if (v.compliant) {
+          const freq = ruleFrequency.get(v.rule_description) ?? "always";
+          if (freq === "at_least_once" || freq === "at_least_n") {
+            satisfied.add(v.rule_description);
+          }
+        }
+      }
+    }
+    return [...satisfied];
+  }, []);
+
   /**
    * Build prior_context string from accumulated reports.
    * Tells the LLM which "at least once" rules are already satisfied per person.
@@ -191,26 +216,10 @@ export default function App() {
     const lines: string[] = [];
     const currentRules = policyRef.current.rules;
 
-    // Build a lookup: rule description → frequency
-    const ruleFrequency = new Map<string, string>();
-    for (const rule of currentRules) {
-      ruleFrequency.set(rule.description, rule.frequency || "always");
-    }
-
     // --- AT_LEAST_ONCE / AT_LEAST_N rules: suppress once satisfied ---
-    const satisfiedOnceRules = new Set<string>();
-    for (const r of reports) {
-      for (const v of r.all_verdicts ?? []) {
-        if (v.compliant) {
-          const freq = ruleFrequency.get(v.rule_description) ?? "always";
-          if (freq === "at_least_once" || freq === "at_least_n") {
-            satisfiedOnceRules.add(v.rule_description);
-          }
-        }
-      }
-    }
+    const satisfiedOnceRules = buildSatisfiedRules(reports);
 
-    if (satisfiedOnceRules.size > 0) {
+    if (satisfiedOnceRules.length > 0) {
       lines.push("ALREADY SATISFIED (frequency-based rules — do NOT re-flag):");
       for (const rule of satisfiedOnceRules) {
         lines.push(`  - "${rule}" → SATISFIED (at-least-once fulfilled)`);
@@ -242,7 +251,7 @@ export default function App() {
     }
 
     return lines.join("\n");
-  }, []);
+  }, [buildSatisfiedRules]);
 
   /** Build accumulated transcript text from all prior reports. */
   const buildAccumulatedTranscript = useCallback((reports: Report[]): string => {
@@ -265,6 +274,7 @@ export default function App() {
     if (priorCtx) {
       currentPolicy.prior_context = priorCtx;
     }
+    currentPolicy.satisfied_rules = buildSatisfiedRules(liveReportsRef.current);
 
     // Accumulate transcript from all prior chunks for speech rules
     const accTranscript = buildAccumulatedTranscript(liveReportsRef.current);
@@ -285,7 +295,7 @@ export default function App() {
       setLiveError(result.error || "Chunk analysis failed.");
       setLiveStage("error");
     }
-  }, [buildPriorContext, buildAccumulatedTranscript]);
+  }, [buildPriorContext, buildSatisfiedRules, buildAccumulatedTranscript]);
 
   /**
    * Capture a single JPEG frame from the live webcam video element.
@@ -369,6 +379,7 @@ export default function App() {
     if (priorCtx) {
       currentPolicy.prior_context = priorCtx;
     }
+    currentPolicy.satisfied_rules = buildSatisfiedRules(liveReportsRef.current);
     // Pass accumulated transcript for speech rule evaluation
     if (accumulatedTranscriptRef.current) {
       currentPolicy.accumulated_transcript = accumulatedTranscriptRef.current;
@@ -388,7 +399,7 @@ export default function App() {
       setLiveStage("error");
       return false;
     }
-  }, [buildPriorContext]);
+  }, [buildPriorContext, buildSatisfiedRules]);
 
   /** DGX batch analysis: send multiple buffered frames as a video clip.
    *  Returns true on success, false on error. */
@@ -400,6 +411,7 @@ export default function App() {
     if (priorCtx) {
       currentPolicy.prior_context = priorCtx;
     }
+    currentPolicy.satisfied_rules = buildSatisfiedRules(liveReportsRef.current);
 
     const result = await analyzeFrameBatch(frames, currentPolicy);
     if (!monitoringRef.current || sessionIdRef.current !== mySession) return false;
@@ -415,7 +427,7 @@ export default function App() {
       setLiveStage("error");
       return false;
     }
-  }, [buildPriorContext]);
+  }, [buildPriorContext, buildSatisfiedRules]);
 
   /** DGX parallel batch analysis: send multiple frame batches concurrently.
    *  Returns true on success, false on error. */
@@ -427,6 +439,7 @@ export default function App() {
     if (priorCtx) {
       currentPolicy.prior_context = priorCtx;
     }
+    currentPolicy.satisfied_rules = buildSatisfiedRules(liveReportsRef.current);
 
     const result = await analyzeFrameBatchParallel(batches, currentPolicy, 3);
     if (!monitoringRef.current || sessionIdRef.current !== mySession) return false;
@@ -442,7 +455,7 @@ export default function App() {
       setLiveStage("error");
       return false;
     }
-  }, [buildPriorContext]);
+  }, [buildPriorContext, buildSatisfiedRules]);
 
   /**
    * Background audio recording loop. Records audio-only chunks from the webcam
@@ -29,13 +29,18 @@ export interface QueueStats {
   workers_online: number;
 }
 
+export type StartAnalysisResponse =
+  | { task_id: string; status: "queued"; status_url: string; cached?: false }
+  | { task_id: null; status: "complete"; cached: true; result: { report: Report } };
+
 /**
- * Start async video analysis. Returns immediately with a task ID.
+ * Start async video analysis. Returns immediately with a task ID, or with the
+ * stored result when an identical video + policy was already analyzed.
  */
 export async function startAsyncAnalysis(
   videoFile: File,
   policy: Policy
-): Promise<{ task_id: string; status_url: string }> {
+): Promise<StartAnalysisResponse> {
   const formData = new FormData();
   formData.append("video", videoFile);
   formData.append("policy_json", JSON.stringify(policy));
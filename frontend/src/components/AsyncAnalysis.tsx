@@ -41,7 +41,21 @@ export default function AsyncAnalysis({ policy, onComplete }: AsyncAnalysisProps
 
     setIsUploading(true);
     try {
-      const { task_id } = await startAsyncAnalysis(file, policy);
+      const started = await startAsyncAnalysis(file, policy);
+      if (started.cached) {
+        // Identical video + policy already analyzed: no task to follow
+        setStatus({
+          task_id: "",
+          state: "SUCCESS",
+          ready: true,
+          successful: true,
+          progress: { stage: "complete", progress: 100, message: "Served from cache" },
+          error: null,
+        });
+        onComplete(started.result.report);
+        return;
+      }
+      const task_id = started.task_id;
       setTaskId(task_id);
 
       // Connect WebSocket for real-time updates
@@ -188,9 +202,11 @@ export default function AsyncAnalysis({ policy, onComplete }: AsyncAnalysisProps
           )}
 
           {/* Task ID */}
-          <div className="mt-4 text-xs text-gray-500">
-            Task ID: <code className="bg-gray-100 px-1 py-0.5 rounded">{taskId}</code>
-          </div>
+          {taskId && (
+            <div className="mt-4 text-xs text-gray-500">
+              Task ID: <code className="bg-gray-100 px-1 py-0.5 rounded">{taskId}</code>
+            </div>
+          )}
         </div>
       )}
     </div>
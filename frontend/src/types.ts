@@ -24,6 +24,7 @@ export interface ReferenceImage {
   match_mode: "must_match" | "must_not_match";
   category: ReferenceCategory;
   checks: string[];
+  mime_type?: string; // Filled in by the backend from the image bytes when omitted
 }
 
 export interface Policy {
@@ -35,6 +36,8 @@ export interface Policy {
   enabled_reference_ids?: string[];
   /** Context from prior monitoring chunks about already-satisfied frequency rules. */
   prior_context?: string;
+  /** Descriptions of at-least-once/at-least-n rules already satisfied in prior chunks (skipped by the backend). */
+  satisfied_rules?: string[];
   /** Full transcript accumulated across all prior monitoring chunks (for speech checklist rules). */
   accumulated_transcript?: string;
 }
@@ -31,7 +31,7 @@ fi
 
 # --- Start backend on port 8082 (matches Vite proxy) ---
 echo "Starting backend on :8082..."
-PYTHONPATH=$(pwd) uvicorn backend.main:app --reload --host 0.0.0.0 --port 8082 > backend.log 2>&1 &
+PYTHONPATH=$(pwd) uvicorn backend.main:app --reload --loop uvloop --http httptools --host 0.0.0.0 --port 8082 > backend.log 2>&1 &
 BACKEND_PID=$!
 
 # --- Start frontend on port 5173 ---
@@ -46,6 +46,7 @@ celery -A backend.services.celery_app worker \
     --loglevel=info \
     --concurrency=2 \
     --pool=threads \
+    -Q celery,gpu,cpu \
     --logfile=celery.log \
     --detach
 
@@ -36,7 +36,7 @@ fi
 
 # Start backend in background
 echo "🚀 Starting backend..."
-PYTHONPATH=$(pwd) uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000 > backend.log 2>&1 &
+PYTHONPATH=$(pwd) uvicorn backend.main:app --reload --loop uvloop --http httptools --host 0.0.0.0 --port 8000 > backend.log 2>&1 &
 BACKEND_PID=$!
 
 # Start frontend in background
@@ -53,7 +53,7 @@ if command -v redis-server &> /dev/null; then
     
     # Start Celery worker
     echo "🔄 Starting Celery worker..."
-    celery -A backend.services.celery_app worker --loglevel=info > celery.log 2>&1 &
+    celery -A backend.services.celery_app worker -Q celery,gpu,cpu --loglevel=info > celery.log 2>&1 &
     CELERY_PID=$!
 fi
 